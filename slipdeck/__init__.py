@@ -1,3 +1,7 @@
 """SlipDeck - Quickly generate professional packing slips for TCGPlayer and eBay orders."""
 
 __version__ = "0.1.0"
+
+from slipdeck.session import Session, SessionResult
+
+__all__ = ["Session", "SessionResult"]
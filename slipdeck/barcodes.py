@@ -0,0 +1,163 @@
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+from fpdf import FPDF
+
+# Bar and space widths, in modules, of every Code 128 symbol value
+CODE128_PATTERNS = [
+    "212222", "222122", "222221", "121223", "121322", "131222", "122213", "122312",
+    "132212", "221213", "221312", "231212", "112232", "122132", "122231", "113222",
+    "123122", "123221", "223211", "221132", "221231", "213212", "223112", "312131",
+    "311222", "321122", "321221", "312212", "322112", "322211", "212123", "212321",
+    "232121", "111323", "131123", "131321", "112313", "132113", "132311", "211313",
+    "231113", "231311", "112133", "112331", "132131", "113123", "113321", "133121",
+    "313121", "211331", "231131", "213113", "213311", "213131", "311123", "311321",
+    "331121", "312113", "312311", "332111", "314111", "221411", "431111", "111224",
+    "111422", "121124", "121421", "141122", "141221", "112214", "112412", "122114",
+    "122411", "142112", "142211", "241211", "221114", "413111", "241112", "134111",
+    "111242", "121142", "121241", "114212", "124112", "124211", "411212", "421112",
+    "421211", "212141", "214121", "412121", "111143", "111341", "131141", "114113",
+    "114311", "411113", "411311", "113141", "114131", "311141", "411131", "211412",
+    "211214", "211232", "2331112",
+]  # fmt: skip
+CODE128_WIDTHS = [
+    tuple(int(width) for width in pattern) for pattern in CODE128_PATTERNS
+]
+CODE128_CODE_C = 99
+CODE128_CODE_B = 100
+CODE128_START_B = 104
+CODE128_START_C = 105
+CODE128_STOP = 106
+# Digit runs shorter than this are cheaper to keep in code set B
+CODE128_MIN_DIGIT_RUN = 4
+CODE128_QUIET_ZONE = 10
+
+
+def count_leading_digits(data: str, start: int) -> int:
+    end = start
+    while end < len(data) and data[end] in "0123456789":
+        end += 1
+    return end - start
+
+
+def encode_code128(data: str) -> List[int]:
+    """
+    Encode text as Code 128 symbol values, including start, checksum and stop.
+
+    Uses code set B for text and switches to code set C for runs of digits,
+    which packs two digits per symbol and keeps the barcode narrow.
+    """
+    values = []
+    code_set = None
+    i = 0
+    while i < len(data):
+        digit_run = count_leading_digits(data, i)
+        if digit_run >= CODE128_MIN_DIGIT_RUN:
+            if code_set != "C":
+                values.append(CODE128_START_C if code_set is None else CODE128_CODE_C)
+                code_set = "C"
+            for j in range(i, i + digit_run - digit_run % 2, 2):
+                values.append(int(data[j : j + 2]))
+            i += digit_run - digit_run % 2
+            continue
+
+        if code_set != "B":
+            values.append(CODE128_START_B if code_set is None else CODE128_CODE_B)
+            code_set = "B"
+        if not 32 <= ord(data[i]) <= 127:
+            raise ValueError(f"Cannot encode {data[i]!r} in a Code 128 barcode")
+        values.append(ord(data[i]) - 32)
+        i += 1
+
+    if code_set is None:
+        values.append(CODE128_START_B)
+
+    checksum = values[0] + sum(i * value for i, value in enumerate(values[1:], 1))
+    values.append(checksum % 103)
+    values.append(CODE128_STOP)
+    return values
+
+
+@lru_cache(maxsize=4096)
+def code128_bars(data: str) -> Tuple[Tuple[Tuple[int, int], ...], int]:
+    """
+    Return the (offset, width) of every bar of the barcode, in modules, and the
+    total width of the barcode in modules
+    """
+    bars = []
+    position = 0
+    for value in encode_code128(data):
+        for element, width in enumerate(CODE128_WIDTHS[value]):
+            if element % 2 == 0:
+                bars.append((position, width))
+            position += width
+    return tuple(bars), position
+
+
+@lru_cache(maxsize=4096)
+def code128_rects(data: str) -> Tuple[Tuple[int, int, int, int], ...]:
+    """The (x, y, width, height) of every bar, in a 1 module high grid"""
+    bars, _ = code128_bars(data)
+    return tuple((offset, 0, width, 1) for offset, width in bars)
+
+
+def draw_module_rects(
+    pdf: FPDF,
+    rects: Sequence[Tuple[int, int, int, int]],
+    x: float,
+    y: float,
+    module_width: float,
+    module_height: float,
+):
+    """
+    Fill rectangles given in module units in black at (x, y), scaled to the
+    module size. The fill colour is set in a local context, so bars stay black
+    whatever colour the page was using.
+    """
+    with pdf.local_context(fill_color=0):
+        for column, row, width, height in rects:
+            pdf.rect(
+                x + column * module_width,
+                y + row * module_height,
+                width * module_width,
+                height * module_height,
+                style="F",
+            )
+
+
+def draw_code128(
+    pdf: FPDF, data: str, x: float, y: float, height: float, module_width: float
+) -> float:
+    """Draw a Code 128 barcode as vector bars and return its width"""
+    _, modules = code128_bars(data)
+    draw_module_rects(pdf, code128_rects(data), x, y, module_width, height)
+    return modules * module_width
+
+
+@lru_cache(maxsize=4096)
+def qr_code_rects(data: str) -> Tuple[Tuple[Tuple[int, int, int, int], ...], int]:
+    """
+    Return the dark modules of a QR code, one rectangle per horizontal run,
+    and the number of modules per side
+    """
+    import segno
+
+    matrix = segno.make_qr(data, error="m").matrix
+    runs = []
+    for row, modules in enumerate(matrix):
+        column = 0
+        while column < len(modules):
+            if modules[column]:
+                start = column
+                while column < len(modules) and modules[column]:
+                    column += 1
+                runs.append((start, row, column - start, 1))
+            else:
+                column += 1
+    return tuple(runs), len(matrix)
+
+
+def draw_qr_code(pdf: FPDF, data: str, x: float, y: float, size: float):
+    """Draw a QR code as vector modules"""
+    rects, modules = qr_code_rects(data)
+    draw_module_rects(pdf, rects, x, y, size / modules, size / modules)
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from slipdeck.models.order import Order
+
+CHECKPOINT_VERSION = 2
+DEFAULT_CHECKPOINT_INTERVAL = 100
+CHECKPOINT_DIR_NAME = ".slipdeck_checkpoint"
+
+
+class PageFailure(BaseModel):
+    stage: str
+    order_number: Optional[str] = None
+    pdf_page: Optional[int] = None
+    error: str
+
+
+class CheckpointState(BaseModel):
+    version: int = CHECKPOINT_VERSION
+    source: str = ""
+    options: str = ""
+    next_page: int = 0
+    parsing_complete: bool = False
+    orders: List[Order] = []
+    quarantined_orders: List[str] = []
+    failures: List[PageFailure] = []
+
+
+def source_fingerprint(path: str) -> str:
+    """Identify an input file by location, size and modification time"""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def options_fingerprint(options: Optional[dict] = None) -> str:
+    """Hash the run options that decide which orders are parsed and how they render"""
+    return hashlib.sha256(
+        json.dumps(options or {}, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class Checkpoint:
+    """
+    Parsing and rendering progress for a single input file.
+
+    Without a checkpoint_dir the state only lives in memory, which still lets
+    callers collect quarantined pages. With one, the state is written to disk
+    every `interval` pages and rendered slips are kept in `render_dir`, so an
+    interrupted run can pick up where it left off.
+    """
+
+    def __init__(
+        self,
+        checkpoint_dir: Optional[str] = None,
+        interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    ):
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        self.interval = interval
+        self.state = CheckpointState()
+
+    @property
+    def state_path(self) -> Optional[Path]:
+        if self.checkpoint_dir is None:
+            return None
+        return self.checkpoint_dir / "state.json"
+
+    @property
+    def render_dir(self) -> Optional[Path]:
+        if self.checkpoint_dir is None:
+            return None
+        render_dir = self.checkpoint_dir / "slips"
+        render_dir.mkdir(parents=True, exist_ok=True)
+        return render_dir
+
+    def load(self, source_path: str, options: Optional[dict] = None) -> bool:
+        """
+        Restore saved state for the input file.
+
+        Returns True when a matching checkpoint was found and will be resumed.
+        A checkpoint left behind by a different input, or by a run with
+        different options (filters, layout, ...), starts over.
+        """
+        source = source_fingerprint(source_path)
+        options = options_fingerprint(options)
+        state_path = self.state_path
+        if state_path is not None and state_path.exists():
+            state = CheckpointState.model_validate_json(state_path.read_text())
+            if (
+                state.version == CHECKPOINT_VERSION
+                and state.source == source
+                and state.options == options
+            ):
+                self.state = state
+                return True
+            self.clear()
+
+        self.state = CheckpointState(source=source, options=options)
+        return False
+
+    def save(self):
+        state_path = self.state_path
+        if state_path is None:
+            return
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_path.with_suffix(".tmp")
+        tmp_path.write_text(self.state.model_dump_json())
+        os.replace(tmp_path, state_path)
+
+    def page_done(self, page_index: int):
+        """Record that a page was processed, saving every `interval` pages"""
+        self.state.next_page = page_index + 1
+        if self.state.next_page % self.interval == 0:
+            self.save()
+
+    def quarantine(
+        self,
+        stage: str,
+        error: str,
+        order_number: Optional[str] = None,
+        pdf_page: Optional[int] = None,
+    ):
+        if order_number and order_number not in self.state.quarantined_orders:
+            self.state.quarantined_orders.append(order_number)
+        self.state.failures.append(
+            PageFailure(
+                stage=stage,
+                order_number=order_number,
+                pdf_page=pdf_page,
+                error=error,
+            )
+        )
+
+    def write_quarantine_report(self, output_dir) -> Optional[Path]:
+        """Write the quarantined pages and their errors as JSON"""
+        if not self.state.failures:
+            return None
+        report_path = (
+            Path(output_dir)
+            / f"Quarantined_Pages_{datetime.now().strftime('%m%d%Y-%H%M')}.json"
+        )
+        report_path.write_text(
+            json.dumps(
+                [failure.model_dump() for failure in self.state.failures], indent=2
+            )
+        )
+        return report_path
+
+    def clear(self):
+        if self.checkpoint_dir is not None and self.checkpoint_dir.exists():
+            shutil.rmtree(self.checkpoint_dir)
@@ -1,12 +1,27 @@
 """Command line interface for Slipdeck."""
 
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from contextlib import nullcontext
+
 import typer
 from rich.console import Console
+from rich.table import Table
 
 from typing_extensions import Annotated
-from typing import Optional
+from typing import List, Optional
 import sys
+from slipdeck.checkpoint import (
+    CHECKPOINT_DIR_NAME,
+    DEFAULT_CHECKPOINT_INTERVAL,
+    Checkpoint,
+    source_fingerprint,
+)
+from slipdeck.combine import combine_orders
 from slipdeck.config.config_manager import config
+from slipdeck.csv_ingest import InputType, detect_input_type, ingest_tcgplayer_csv
+from slipdeck.inventory import InventoryIndex
+from slipdeck.ledger import OrderLedger
 
 from rich.progress import (
     Progress,
@@ -17,9 +32,26 @@ from rich.progress import (
 )
 
 from slipdeck.models.order import Marketplace
-from slipdeck.models.pull_card import PullCard
-from slipdeck.pdf_creator import create_order_pdf, create_pull_sheet
-from slipdeck.pdf_processor import parse_packing_slips
+from slipdeck.pdf_creator import (
+    LAYOUT_VERSION,
+    create_pull_sheet,
+    group_pull_cards,
+    load_logo,
+)
+from slipdeck.pdf_processor import index_packing_slips, parse_packing_slips
+from slipdeck.progress import (
+    JsonlProgressReporter,
+    ProgressFormat,
+    RichProgressReporter,
+)
+from slipdeck.render_cache import (
+    DEFAULT_RENDER_CACHE_DIR,
+    DEFAULT_RENDER_CACHE_SIZE_MB,
+    RenderCache,
+)
+from slipdeck.render_backend import RenderBackend, create_order_slips
+from slipdeck.reprint import extract_orders, find_indexes
+from slipdeck.zpl_creator import connect_to_printer
 import os
 
 # Import your logic modules here
@@ -29,11 +61,27 @@ app = typer.Typer(help="Slipdeck CLI tool")
 console = Console()
 
 
+def split_order_numbers(order_numbers: Optional[List[str]]) -> Optional[List[str]]:
+    if order_numbers is None:
+        return None
+    return [
+        order_number.strip()
+        for value in order_numbers
+        for order_number in value.split(",")
+        if order_number.strip()
+    ]
+
+
 @app.command(
     "pack", help="Create thermal printer friendly packing slips from TCG Player orders."
 )
 def pack(
-    input_file: str,
+    input_file: Annotated[
+        str,
+        typer.Argument(
+            help="TCGplayer packing slip PDF, or order list CSV export (with --pull-sheet-csv)"
+        ),
+    ],
     output_file_dir: Annotated[
         str,
         typer.Option("-o", "--output-dir", help="Output directory for packing slips"),
@@ -49,138 +97,474 @@ def pack(
             "-npull", "--no-pull-sheet", help="Don't create a sorted pull sheet"
         ),
     ] = False,
+    output_format: Annotated[
+        RenderBackend,
+        typer.Option(
+            "-f",
+            "--format",
+            help="Packing slip output format (pdf, or zpl for Zebra thermal printers)",
+        ),
+    ] = RenderBackend.PDF,
+    printer: Annotated[
+        Optional[str],
+        typer.Option(
+            "--printer",
+            help="Send ZPL packing slips to a printer's raw port (HOST[:PORT], default port 9100)",
+        ),
+    ] = None,
+    ledger_path: Annotated[
+        Optional[str],
+        typer.Option(
+            "--ledger",
+            help="SQLite ledger of printed orders; orders already in it are skipped",
+        ),
+    ] = None,
+    reprint: Annotated[
+        bool,
+        typer.Option("--reprint", help="Process orders already recorded in the ledger"),
+    ] = False,
+    no_checkpoint: Annotated[
+        bool,
+        typer.Option(
+            "--no-checkpoint",
+            help="Don't save progress to disk for resuming an interrupted run",
+        ),
+    ] = False,
+    checkpoint_interval: Annotated[
+        int,
+        typer.Option(
+            "--checkpoint-interval",
+            min=1,
+            help="Number of pages parsed between checkpoints",
+        ),
+    ] = DEFAULT_CHECKPOINT_INTERVAL,
+    no_render_cache: Annotated[
+        bool,
+        typer.Option(
+            "--no-render-cache", help="Render every packing slip from scratch"
+        ),
+    ] = False,
+    render_cache_dir: Annotated[
+        str,
+        typer.Option(
+            "--render-cache-dir", help="Directory of cached packing slip renders"
+        ),
+    ] = str(DEFAULT_RENDER_CACHE_DIR),
+    render_cache_size: Annotated[
+        int,
+        typer.Option(
+            "--render-cache-size",
+            min=1,
+            help="Maximum render cache size in MB before old entries are evicted",
+        ),
+    ] = DEFAULT_RENDER_CACHE_SIZE_MB,
+    chunk_size: Annotated[
+        Optional[int],
+        typer.Option(
+            "--chunk-size",
+            min=1,
+            help="Write PDF packing slips in parts of N orders as soon as each part is ready",
+        ),
+    ] = None,
+    write_manifest: Annotated[
+        bool,
+        typer.Option(
+            "--manifest", help="Write a JSON manifest of the chunked packing slip parts"
+        ),
+    ] = False,
+    order_numbers: Annotated[
+        Optional[List[str]],
+        typer.Option(
+            "--orders",
+            help="Only process these order numbers (comma separated, may be repeated)",
+        ),
+    ] = None,
+    shipping_method: Annotated[
+        Optional[str],
+        typer.Option(
+            "--shipping-method",
+            help="Only process orders whose shipping method contains this text",
+        ),
+    ] = None,
+    logo_path: Annotated[
+        Optional[str],
+        typer.Option("--logo", help="Image file to print in the packing slip header"),
+    ] = None,
+    qr_code: Annotated[
+        bool,
+        typer.Option(
+            "--qr", help="Also print a QR code of the order number on each packing slip"
+        ),
+    ] = False,
+    inventory_path: Annotated[
+        Optional[str],
+        typer.Option(
+            "--inventory",
+            help="Inventory CSV with Set, Number and Location (or Bin and Slot) columns to sort the pull sheet by shelf location",
+        ),
+    ] = None,
+    combine: Annotated[
+        bool,
+        typer.Option(
+            "--combine",
+            help="Print one packing slip for orders from the same buyer to the same address",
+        ),
+    ] = False,
+    progress_format: Annotated[
+        ProgressFormat,
+        typer.Option(
+            "--progress-format",
+            help="Show progress bars (rich), or write JSON lines progress events to stdout (jsonl)",
+        ),
+    ] = ProgressFormat.RICH,
+    pull_sheet_csv: Annotated[
+        Optional[str],
+        typer.Option(
+            "--pull-sheet-csv",
+            help="TCGplayer pull sheet CSV export with the cards of the orders in a CSV order list",
+        ),
+    ] = None,
 ):
     """
     Create thermal printer friendly packing slips from TCG Player orders.
 
     Args:
-        input_file: Path to the input CSV file containing TCG Player orders.
+        input_file: Path to the TCG Player packing slip PDF, or to the order
+            list CSV export when the cards come from a pull sheet CSV export.
     """
-    # Check if output directory exists, create it if it doesn't
-    if not os.path.exists(output_file_dir):
-        console.print(
-            f"[yellow]Output directory '{output_file_dir}' doesn't exist. Creating it..."
-        )
-        os.makedirs(output_file_dir)
-        console.print(f"[green]Created output directory: {output_file_dir}")
-
     company_name = company_name or config.get_company_name()
     marketplace = Marketplace.TCGPLAYER
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        console=Console(),  # Create a console instance
-        transient=True,  # Keep progress bars visible after completion
-    ) as progress:
-        # Check that input path is a pdf file
-        if not input_file.endswith(".pdf"):
-            progress.console.print("[red]Error: Input file must be a PDF.")
+    with (
+        Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            console=Console(),  # Create a console instance
+            transient=True,  # Keep progress bars visible after completion
+        )
+        if progress_format == ProgressFormat.RICH
+        else nullcontext()
+    ) as rich_progress:
+        progress = (
+            RichProgressReporter(rich_progress)
+            if rich_progress is not None
+            else JsonlProgressReporter()
+        )
+
+        if printer and output_format != RenderBackend.ZPL:
+            progress.log("[red]Error: --printer can only be used with --format zpl.")
             raise typer.Exit(code=1)
 
-        # Create tasks for different operations
-        parse_task = progress.add_task("[cyan]Parsing PDF and processing orders...")
-        pdf_task = progress.add_task("[cyan]Creating PDFs...")
+        if printer:
+            # Fail before parsing the whole batch if the printer can't be reached
+            try:
+                connect_to_printer(printer).close()
+            except (ValueError, ConnectionError) as e:
+                progress.log(f"[red]Error: {e}")
+                raise typer.Exit(code=1)
 
-        progress.console.print(
-            f"[blue]Packing slips will be generated from {input_file}"
-        )
+        if output_format == RenderBackend.ZPL:
+            pdf_only_options = [
+                option
+                for option, used in (
+                    ("--chunk-size", chunk_size is not None),
+                    ("--manifest", write_manifest),
+                    (
+                        "--render-cache-dir",
+                        render_cache_dir != str(DEFAULT_RENDER_CACHE_DIR),
+                    ),
+                    (
+                        "--render-cache-size",
+                        render_cache_size != DEFAULT_RENDER_CACHE_SIZE_MB,
+                    ),
+                )
+                if used
+            ]
+            if pdf_only_options:
+                progress.log(
+                    f"[red]Error: {', '.join(pdf_only_options)} can only be used with --format pdf."
+                )
+                raise typer.Exit(code=1)
+
+        if qr_code:
+            try:
+                import segno  # noqa: F401
+            except ImportError:
+                progress.log(
+                    "[red]Error: --qr requires the segno package (pip install slipdeck[qr])."
+                )
+                raise typer.Exit(code=1)
 
-        orders = parse_packing_slips(input_file, marketplace, progress, parse_task)
+        # Check if output directory exists, create it if it doesn't
+        if not os.path.exists(output_file_dir):
+            progress.log(
+                f"[yellow]Output directory '{output_file_dir}' doesn't exist. Creating it..."
+            )
+            os.makedirs(output_file_dir)
+            progress.log(f"[green]Created output directory: {output_file_dir}")
 
-        if not no_packing_slip:
-            create_order_pdf(
-                orders,
-                output_file_dir,
-                company_name,
+        # Work out whether we got packing slips or TCG Player CSV exports
+        input_types = {
+            detect_input_type(path): path
+            for path in (input_file, pull_sheet_csv)
+            if path is not None
+        }
+        if InputType.PDF in input_types and pull_sheet_csv is not None:
+            progress.log(
+                "[red]Error: --pull-sheet-csv can only be used with an order list "
+                "CSV, not with a packing slip PDF."
+            )
+            raise typer.Exit(code=1)
+        if (
+            InputType.PDF not in input_types
+            and not {
+                InputType.ORDER_LIST_CSV,
+                InputType.PULL_SHEET_CSV,
+            }
+            <= input_types.keys()
+        ):
+            progress.log(
+                "[red]Error: Input must be a packing slip PDF, or an order list CSV "
+                "together with a pull sheet CSV."
+            )
+            raise typer.Exit(code=1)
+
+        progress.log(f"[blue]Packing slips will be generated from {input_file}")
+
+        selected_orders = split_order_numbers(order_numbers)
+        logo = load_logo(logo_path) if logo_path else None
+
+        checkpoint = Checkpoint(
+            (
+                None
+                if no_checkpoint
+                else os.path.join(output_file_dir, CHECKPOINT_DIR_NAME)
+            ),
+            checkpoint_interval,
+        )
+        # Everything that changes which orders are parsed or how their slips
+        # look, so a checkpoint of a run with other options is not resumed
+        run_options = {
+            "selected_orders": selected_orders,
+            "shipping_method": shipping_method,
+            "ledger": os.path.abspath(ledger_path) if ledger_path else None,
+            "reprint": reprint,
+            "combine": combine,
+            "logo": logo.name if logo is not None else None,
+            "qr_code": qr_code,
+            "company_name": company_name,
+            "layout_version": LAYOUT_VERSION,
+            "pull_sheet_csv": (
+                source_fingerprint(pull_sheet_csv) if pull_sheet_csv else None
+            ),
+        }
+        if checkpoint.load(input_file, run_options):
+            progress.log(
+                f"[yellow]Resuming from checkpoint at page {checkpoint.state.next_page + 1}"
+            )
+
+        ledger = OrderLedger(ledger_path) if ledger_path else None
+        if InputType.PDF in input_types:
+            orders = parse_packing_slips(
+                input_types[InputType.PDF],
                 marketplace,
                 progress,
-                pdf_task,
+                skip_orders=None if reprint else ledger,
+                checkpoint=checkpoint,
+                selected_orders=selected_orders,
+                shipping_method=shipping_method,
+            )
+        else:
+            progress.start_stage("parse", "Loading orders from CSV", "orders")
+            orders = ingest_tcgplayer_csv(
+                input_types[InputType.ORDER_LIST_CSV],
+                input_types[InputType.PULL_SHEET_CSV],
+                marketplace,
+                seller_name=company_name,
+                skip_orders=None if reprint else ledger,
+                selected_orders=selected_orders,
+                shipping_method=shipping_method,
             )
+            progress.advance("parse", len(orders), orders=len(orders))
+            progress.end_stage("parse", f"Loaded {len(orders)} orders from CSV")
 
+        pull_cards = None
         if not no_pull_sheet:
-            magic_cards: list[PullCard] = []
-            magic_card_dict = {}
-            pokemon_cards: list[PullCard] = []
-            pokemon_card_dict = {}
-            misc_cards: list[PullCard] = []
-            misc_card_dict = {}
-
-            for order in orders:
-                for card in order.info.cards:
-                    card_name = f"{card.set} {card.name} {card.number}"
-                    if card.product_line == "Magic":
-                        if card_name in magic_card_dict:
-                            # Get existing card and update quantity and order info
-                            existing_card: PullCard = magic_card_dict[card_name]
-                            # existing_card.quantity += int(card["Quantity"])
-                            # existing_card.order_number += f", {order_number}"
-                            existing_card.quantity += int(card.Quantity)
-                            existing_card.order_number += f", {order.number}"
-                        else:
-                            new_card: PullCard = PullCard(
-                                name=card_name,
-                                description=card.Description,
-                                number=card.number,
-                                set=card.set,
-                                rarity=card.rarity,
-                                condition=card.condition,
-                                price=card.Price,
-                                quantity=card.Quantity,
-                                order_number=order.number,
-                            )
-                            magic_card_dict[card_name] = new_card
-                            magic_cards.append(new_card)
-                    elif card.product_line.startswith("Pokemon"):
-                        if card_name in pokemon_card_dict:
-                            # Get existing card and update quantity and order info
-                            existing_card = pokemon_card_dict[card_name]
-                            existing_card.quantity += int(card.Quantity)
-                            existing_card.order_number += f", {order.number}"
-                        else:
-                            new_card: PullCard = PullCard(
-                                name=card_name,
-                                description=card.Description,
-                                number=card.number,
-                                set=card.set,
-                                rarity=card.rarity,
-                                condition=card.condition,
-                                price=card.Price,
-                                quantity=card.Quantity,
-                                order_number=order.number,
-                            )
-                            pokemon_card_dict[card_name] = new_card
-                            pokemon_cards.append(new_card)
-                    else:
-                        if card_name in misc_card_dict:
-                            # Get existing card and update quantity and order info
-                            existing_card = misc_card_dict[card_name]
-                            existing_card.quantity += int(card.Quantity)
-                            existing_card.order_number += f", {order.number}"
-                        else:
-                            new_card: PullCard = PullCard(
-                                name=card_name,
-                                description=card.Description,
-                                number=card.number,
-                                set=card.set,
-                                rarity=card.rarity,
-                                condition=card.condition,
-                                price=card.Price,
-                                quantity=card.Quantity,
-                                order_number=order.number,
+            inventory = None
+            if inventory_path:
+                try:
+                    inventory = InventoryIndex.load(inventory_path)
+                except ValueError as e:
+                    progress.log(f"[red]Error: {e}")
+                    raise typer.Exit(code=1)
+            pull_cards = group_pull_cards(orders, inventory)
+            progress.start_stage("pull_sheet", "Creating pull sheet", "orders")
+
+        # The pull sheet and the packing slips only read the parsed batch, so
+        # render the pull sheet in its own process while the slips render here.
+        # The worker is spawned rather than forked from this process, whose
+        # progress display thread may hold the stdout lock at fork time.
+        with (
+            ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            )
+            if pull_cards is not None and not no_packing_slip
+            else nullcontext()
+        ) as pull_sheet_executor:
+            pull_sheet_future = (
+                pull_sheet_executor.submit(
+                    create_pull_sheet, *pull_cards, output_file_dir
+                )
+                if pull_sheet_executor is not None
+                else None
+            )
+
+            if not no_packing_slip:
+                slip_orders = orders
+                if combine:
+                    slip_orders = combine_orders(orders)
+                    if len(slip_orders) < len(orders):
+                        progress.log(
+                            f"[blue]Combined {len(orders)} orders into {len(slip_orders)} packing slips"
+                        )
+                try:
+                    create_order_slips(
+                        output_format,
+                        slip_orders,
+                        output_file_dir,
+                        company_name,
+                        marketplace,
+                        progress,
+                        printer=printer,
+                        checkpoint=checkpoint,
+                        render_cache=(
+                            None
+                            if no_render_cache or output_format != RenderBackend.PDF
+                            else RenderCache(
+                                render_cache_dir, render_cache_size * 1024 * 1024
                             )
-                            misc_card_dict[card_name] = new_card
-                            misc_cards.append(new_card)
-
-            # Sort the cards by name
-            create_pull_sheet(
-                magic_cards,
-                pokemon_cards,
-                misc_cards,
-                output_file_dir,
+                        ),
+                        chunk_size=chunk_size,
+                        write_manifest=write_manifest,
+                        logo=logo,
+                        qr_code=qr_code,
+                    )
+                except ConnectionError as e:
+                    progress.log(f"[red]Error: {e}")
+                    raise typer.Exit(code=1)
+                if ledger is not None:
+                    quarantined_orders = set(checkpoint.state.quarantined_orders)
+                    ledger.record(
+                        order
+                        for order in orders
+                        if order.number not in quarantined_orders
+                    )
+
+            if pull_cards is not None:
+                pull_sheet_path = (
+                    pull_sheet_future.result()
+                    if pull_sheet_future is not None
+                    else create_pull_sheet(*pull_cards, output_file_dir)
+                )
+                progress.advance("pull_sheet", len(orders))
+                progress.end_stage(
+                    "pull_sheet", f"Wrote pull sheet to {pull_sheet_path}"
+                )
+
+        if ledger is not None:
+            ledger.close()
+
+        report_path = checkpoint.write_quarantine_report(output_file_dir)
+        if report_path is not None:
+            progress.log(
+                f"[yellow]Quarantined {len(checkpoint.state.failures)} failed pages or orders, see {report_path}"
             )
+        checkpoint.clear()
+
+
+@app.command(
+    "reprint", help="Extract the packing slips of specific orders from a merged batch."
+)
+def reprint_orders(
+    order_numbers: Annotated[
+        List[str], typer.Argument(help="Order numbers to reprint")
+    ],
+    batch: Annotated[
+        Optional[str],
+        typer.Option(
+            "-b",
+            "--batch",
+            help="Merged packing slip PDF (or its .index.json); defaults to searching every batch in the output directory, newest first",
+        ),
+    ] = None,
+    output_file_dir: Annotated[
+        str,
+        typer.Option("-o", "--output-dir", help="Output directory for packing slips"),
+    ] = "./output",
+):
+    """
+    Extract the packing slips of specific orders from a merged batch.
+
+    Uses the index written next to each merged packing slip PDF, so nothing is
+    parsed or rendered again.
+    """
+    batches = [batch] if batch else find_indexes(output_file_dir)
+    if not batches:
+        console.print(f"[red]Error: No packing slip batch found in {output_file_dir}.")
+        raise typer.Exit(code=1)
+
+    reprint_path, missing = extract_orders(batches, order_numbers, output_file_dir)
+    for order_number in missing:
+        console.print(f"[yellow]Order {order_number} was not found in any batch")
+
+    if reprint_path is None:
+        raise typer.Exit(code=1)
+    console.print(f"[green]Wrote reprint to {reprint_path}")
+
+
+@app.command("inspect", help="Summarize the orders and pages in a packing slip PDF.")
+def inspect(
+    input_file: str,
+    show_shipping_method: Annotated[
+        bool,
+        typer.Option(
+            "--shipping-method", help="Also read each order's shipping method"
+        ),
+    ] = False,
+):
+    """
+    Summarize the orders and pages in a packing slip PDF.
+
+    Only reads the header of each page, so it is fast even for large batches.
+    """
+    pages_by_order = {}
+    for entry in index_packing_slips(input_file, show_shipping_method):
+        pages_by_order.setdefault(entry.order_number, []).append(entry)
+
+    table = Table(title=f"{len(pages_by_order)} orders in {input_file}")
+    table.add_column("Order")
+    table.add_column("Pages", justify="right")
+    table.add_column("PDF Pages", justify="right")
+    if show_shipping_method:
+        table.add_column("Shipping Method")
+
+    for order_number, entries in pages_by_order.items():
+        pdf_pages = [entry.page_info.pdf_page for entry in entries]
+        page_count = f"{len(entries)}"
+        if len(entries) != entries[0].page_info.total_pages:
+            page_count = f"[red]{len(entries)} of {entries[0].page_info.total_pages}"
+        row = [
+            order_number,
+            page_count,
+            f"{min(pdf_pages)}-{max(pdf_pages)}",
+        ]
+        if show_shipping_method:
+            row.append(entries[0].shipping_method or "")
+        table.add_row(*row)
+
+    console.print(table)
 
 
 if __name__ == "__main__":
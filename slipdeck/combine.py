@@ -0,0 +1,121 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from slipdeck.models.order import Card, Order, OrderInfo
+from slipdeck.utilities.price_util import get_price_as_float
+
+ADDRESS_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "road": "rd",
+    "drive": "dr",
+    "boulevard": "blvd",
+    "lane": "ln",
+    "court": "ct",
+    "place": "pl",
+    "circle": "cir",
+    "terrace": "ter",
+    "highway": "hwy",
+    "parkway": "pkwy",
+    "north": "n",
+    "south": "s",
+    "east": "e",
+    "west": "w",
+}
+# "Apt 3", "Unit 3", "Suite 3" and "#3" all mean the same unit
+UNIT_DESIGNATORS = {"apt", "apartment", "unit", "suite", "ste"}
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_address_text(text: str) -> str:
+    words = WORD_PATTERN.findall((text or "").lower())
+    return " ".join(
+        ADDRESS_ABBREVIATIONS.get(word, word)
+        for word in words
+        if word not in UNIT_DESIGNATORS
+    )
+
+
+def combine_key(order: Order) -> Tuple[str, ...]:
+    """Buyer and normalized shipping address orders must share to be combined"""
+    address = order.info.shipping_address
+    return (
+        order.info.marketplace.value,
+        normalize_address_text(order.info.sale_information.buyer_name),
+        normalize_address_text(address.name),
+        normalize_address_text(f"{address.address_line1} {address.address_line2}"),
+        normalize_address_text(address.city),
+        normalize_address_text(address.state),
+        re.sub(r"\D", "", address.zip_code)[:5],
+    )
+
+
+def combine_cards(orders: List[Order]) -> List[Card]:
+    """Concatenate the card tables, adding up cards bought in several orders"""
+    cards: Dict[Tuple[str, str], Card] = {}
+    for order in orders:
+        for card in order.info.cards:
+            key = (card.Description, card.Price)
+            if key not in cards:
+                cards[key] = card.model_copy()
+                continue
+            combined_card = cards[key]
+            quantity = int(combined_card.Quantity) + int(card.Quantity)
+            combined_card.Quantity = str(quantity)
+            if combined_card.Price:
+                total_price = get_price_as_float(combined_card.Total_Price) + (
+                    get_price_as_float(card.Total_Price)
+                )
+                combined_card.Total_Price = f"${total_price:.2f}"
+    return list(cards.values())
+
+
+def combine_order_totals(orders: List[Order]) -> Optional[str]:
+    """Add up the marketplace order totals, unless one of the orders has none"""
+    if not all(order.info.order_total for order in orders):
+        return None
+    total = sum(get_price_as_float(order.info.order_total) for order in orders)
+    return f"${total:.2f}"
+
+
+def combine_orders(orders: List[Order]) -> List[Order]:
+    """
+    Merge orders going to the same buyer at the same address into one order.
+
+    Orders are grouped by combine_key in a single pass. A group of several
+    orders becomes one order numbered after its first order, listing every
+    order number in combined_numbers and carrying all of their cards. Orders
+    without a match are returned unchanged, in their original order.
+    """
+    groups: Dict[Tuple[str, ...], List[Order]] = {}
+    for order in orders:
+        groups.setdefault(combine_key(order), []).append(order)
+
+    combined_orders = []
+    for group in groups.values():
+        if len(group) == 1:
+            combined_orders.append(group[0])
+            continue
+
+        first = group[0]
+        combined_orders.append(
+            Order(
+                number=first.number,
+                info=OrderInfo(
+                    page_info=[
+                        page_info
+                        for order in group
+                        for page_info in order.info.page_info
+                    ],
+                    shipping_address=first.info.shipping_address,
+                    cards=combine_cards(group),
+                    sale_information=first.info.sale_information,
+                    marketplace=first.info.marketplace,
+                    order_total=combine_order_totals(group),
+                ),
+                combined_numbers=[
+                    number for order in group for number in order.order_numbers
+                ],
+            )
+        )
+    return combined_orders
@@ -0,0 +1,190 @@
+import csv
+from enum import Enum
+from typing import Collection, Container, Dict, Iterable, List, Optional
+
+from slipdeck.models.order import (
+    Card,
+    Marketplace,
+    Order,
+    OrderInfo,
+    SaleInformation,
+    ShippingAddress,
+)
+from slipdeck.utilities.price_util import get_price_as_float
+
+# TCGplayer "Export Order List" columns
+ORDER_NUMBER_COLUMN = "Order #"
+ORDER_LIST_COLUMNS = {
+    ORDER_NUMBER_COLUMN,
+    "FirstName",
+    "LastName",
+    "Address1",
+    "City",
+    "State",
+    "PostalCode",
+}
+ORDER_TOTAL_COLUMN = "Value Of Products"
+# TCGplayer "Export Pull Sheet" columns
+ORDER_QUANTITY_COLUMN = "Order Quantity"
+PULL_SHEET_COLUMNS = {"Product Line", "Product Name", "Set", ORDER_QUANTITY_COLUMN}
+# The pull sheet has no sale price, so use one of these if the export was
+# extended. Without one the cards are left unpriced and the slip total comes
+# from the order list.
+PRICE_COLUMNS = ["Price", "Sale Price", "TCG Marketplace Price", "TCG Market Price"]
+
+
+class InputType(str, Enum):
+    PDF = "pdf"
+    ORDER_LIST_CSV = "order list csv"
+    PULL_SHEET_CSV = "pull sheet csv"
+    UNKNOWN = "unknown"
+
+
+def detect_input_type(path: str) -> InputType:
+    """Tell packing slip PDFs and TCGplayer CSV exports apart by their content"""
+    with open(path, "rb") as f:
+        if f.read(5) == b"%PDF-":
+            return InputType.PDF
+
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            header = set(next(csv.reader(f), []))
+    except (UnicodeDecodeError, csv.Error):
+        # Neither a PDF nor a text CSV, like an image
+        return InputType.UNKNOWN
+    if ORDER_LIST_COLUMNS <= header:
+        return InputType.ORDER_LIST_CSV
+    if PULL_SHEET_COLUMNS <= header:
+        return InputType.PULL_SHEET_CSV
+    return InputType.UNKNOWN
+
+
+def row_to_order_info(
+    row: Dict[str, str], marketplace: Marketplace, seller_name: str
+) -> OrderInfo:
+    name = f"{row['FirstName']} {row['LastName']}".strip()
+    city, state, zip_code = row["City"], row["State"], row["PostalCode"]
+    return OrderInfo(
+        page_info=[],
+        shipping_address=ShippingAddress(
+            name=name,
+            address_line1=row["Address1"],
+            address_line2=row.get("Address2") or "",
+            city_state_zip=f"{city}, {state} {zip_code}",
+            city=city,
+            state=state,
+            zip_code=zip_code,
+        ),
+        cards=[],
+        sale_information=SaleInformation(
+            order_date=row.get("Order Date", ""),
+            shipping_method=row.get("Shipping Method", ""),
+            buyer_name=name,
+            seller_name=seller_name,
+        ),
+        marketplace=marketplace,
+        order_total=(row.get(ORDER_TOTAL_COLUMN) or "").strip() or None,
+    )
+
+
+def parse_order_quantities(value: str) -> Iterable[tuple]:
+    """Split an "ORDER:QTY, ORDER:QTY" pull sheet cell into (order, quantity)"""
+    for item in value.replace(";", ",").split(","):
+        order_number, _, quantity = item.strip().rpartition(":")
+        if order_number:
+            yield order_number.strip(), quantity.strip()
+
+
+def row_to_card_fields(row: Dict[str, str], price_column: Optional[str]) -> dict:
+    """Card fields shared by every order listed on a pull sheet row"""
+    card_info = {
+        "product_line": row["Product Line"],
+        "set": row["Set"],
+        "name": row["Product Name"],
+        "number": row.get("Number", ""),
+        "rarity": row.get("Rarity", ""),
+        "condition": row.get("Condition", ""),
+    }
+    price = row[price_column] if price_column else None
+    return {
+        "Description": " - ".join(card_info.values()),
+        "Price": f"${get_price_as_float(price):.2f}" if price else None,
+        **card_info,
+    }
+
+
+def ingest_tcgplayer_csv(
+    order_list_path: str,
+    pull_sheet_path: str,
+    marketplace: Marketplace = Marketplace.TCGPLAYER,
+    seller_name: str = "",
+    skip_orders: Optional[Container[str]] = None,
+    selected_orders: Optional[Collection[str]] = None,
+    shipping_method: Optional[str] = None,
+) -> List[Order]:
+    """
+    Build orders from TCGplayer's order list and pull sheet CSV exports.
+
+    Both files are streamed row by row. The filters match the ones of
+    parse_packing_slips, and filtered out orders never get their cards built.
+
+    TCGplayer's pull sheet has no prices, so unless it has a price column the
+    cards are left unpriced and the order total is taken from the order list.
+    """
+    orders: Dict[str, Order] = {}
+    selected_orders = set(selected_orders) if selected_orders is not None else None
+    shipping_method = shipping_method.lower() if shipping_method else None
+
+    with open(order_list_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            order_number = row[ORDER_NUMBER_COLUMN].strip()
+            if not order_number:
+                continue
+            if skip_orders is not None and order_number in skip_orders:
+                continue
+            if selected_orders is not None and order_number not in selected_orders:
+                continue
+            if (
+                shipping_method
+                and shipping_method not in row.get("Shipping Method", "").lower()
+            ):
+                continue
+            orders[order_number] = Order(
+                number=order_number,
+                info=row_to_order_info(row, marketplace, seller_name),
+            )
+
+    with open(pull_sheet_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        price_column = next(
+            (column for column in PRICE_COLUMNS if column in (reader.fieldnames or [])),
+            None,
+        )
+        for row in reader:
+            card_fields = price_value = None
+            for order_number, quantity in parse_order_quantities(
+                row[ORDER_QUANTITY_COLUMN]
+            ):
+                order = orders.get(order_number)
+                if order is None:
+                    continue
+                if card_fields is None:
+                    card_fields = row_to_card_fields(row, price_column)
+                    price_value = (
+                        get_price_as_float(card_fields["Price"])
+                        if card_fields["Price"]
+                        else None
+                    )
+                order.info.cards.append(
+                    Card(
+                        Quantity=quantity,
+                        Total_Price=(
+                            f"${price_value * float(quantity):.2f}"
+                            if price_value is not None
+                            else ""
+                        ),
+                        **card_fields,
+                    )
+                )
+
+    return list(orders.values())
@@ -0,0 +1,97 @@
+import csv
+import re
+from typing import Dict, NamedTuple, Optional, Tuple
+
+SET_COLUMNS = ["Set", "Set Name"]
+NUMBER_COLUMNS = ["Number", "Card Number"]
+LOCATION_COLUMN = "Location"
+BIN_COLUMN = "Bin"
+SLOT_COLUMN = "Slot"
+NATURAL_SORT_PATTERN = re.compile(r"(\d+)")
+
+NaturalSortKey = Tuple[Tuple[int, int, str], ...]
+
+
+def natural_sort_key(text: str) -> NaturalSortKey:
+    """Collation key comparing digit runs by value, so "2" sorts before "10" """
+    return tuple(
+        (0, int(part), "") if part.isdecimal() else (1, 0, part.lower())
+        for part in NATURAL_SORT_PATTERN.split(text or "")
+        if part
+    )
+
+
+def normalize_set(set_name: str) -> str:
+    return " ".join((set_name or "").lower().split())
+
+
+def normalize_number(number: str) -> str:
+    """Treat "006/102", "6/102" and "6" as the same card number"""
+    number = (number or "").split("/")[0].strip().lower()
+    return number.lstrip("0") or number
+
+
+class InventoryLocation(NamedTuple):
+    location: str
+    sort_key: NaturalSortKey
+
+
+class InventoryIndex:
+    """
+    Shelf location of every card in an inventory CSV, keyed by set and number.
+
+    The CSV needs a set and a number column plus either a Location column or
+    Bin and Slot columns. Sort keys are computed once while loading, so
+    looking up and ordering a card later is a dict lookup.
+    """
+
+    def __init__(
+        self, locations: Optional[Dict[Tuple[str, str], InventoryLocation]] = None
+    ):
+        self.locations = locations if locations is not None else {}
+
+    def __len__(self):
+        return len(self.locations)
+
+    @classmethod
+    def load(cls, csv_path: str) -> "InventoryIndex":
+        locations: Dict[Tuple[str, str], InventoryLocation] = {}
+        with open(csv_path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            columns = reader.fieldnames or []
+            set_column = next((c for c in SET_COLUMNS if c in columns), None)
+            number_column = next((c for c in NUMBER_COLUMNS if c in columns), None)
+            has_bins = BIN_COLUMN in columns
+            if (
+                set_column is None
+                or number_column is None
+                or not (LOCATION_COLUMN in columns or has_bins)
+            ):
+                raise ValueError(
+                    f"Inventory file {csv_path} needs Set, Number and Location "
+                    "(or Bin and Slot) columns"
+                )
+
+            for row in reader:
+                if has_bins:
+                    bin_name = (row[BIN_COLUMN] or "").strip()
+                    slot = (row.get(SLOT_COLUMN) or "").strip()
+                    location = f"{bin_name}-{slot}" if slot else bin_name
+                    sort_key = natural_sort_key(bin_name) + natural_sort_key(slot)
+                else:
+                    location = (row[LOCATION_COLUMN] or "").strip()
+                    sort_key = natural_sort_key(location)
+                if not location:
+                    continue
+
+                key = (
+                    normalize_set(row[set_column]),
+                    normalize_number(row[number_column]),
+                )
+                # Keep the first location listed for a card
+                if key not in locations:
+                    locations[key] = InventoryLocation(location, sort_key)
+        return cls(locations)
+
+    def lookup(self, set_name: str, number: str) -> Optional[InventoryLocation]:
+        return self.locations.get((normalize_set(set_name), normalize_number(number)))
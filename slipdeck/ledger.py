@@ -0,0 +1,71 @@
+import hashlib
+import sqlite3
+from datetime import datetime
+from typing import Iterable, Optional
+
+from slipdeck.models.order import Order
+
+
+def order_content_hash(order: Order) -> str:
+    return hashlib.sha256(order.info.model_dump_json().encode("utf-8")).hexdigest()
+
+
+class OrderLedger:
+    """
+    SQLite record of the orders whose packing slips have already been produced,
+    keyed by order number.
+
+    Supports ``order_number in ledger`` so it can be handed to
+    ``parse_packing_slips`` to skip previously printed orders.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS processed_orders (
+                order_number TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                printed_at TEXT NOT NULL
+            )
+            """)
+        self.connection.commit()
+
+    def __contains__(self, order_number: str) -> bool:
+        row = self.connection.execute(
+            "SELECT 1 FROM processed_orders WHERE order_number = ?", (order_number,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM processed_orders"
+        ).fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_content_hash(self, order_number: str) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT content_hash FROM processed_orders WHERE order_number = ?",
+            (order_number,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def record(self, orders: Iterable[Order]):
+        """Mark the orders as printed, replacing any earlier entry"""
+        printed_at = datetime.now().isoformat(timespec="seconds")
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO processed_orders VALUES (?, ?, ?)",
+                (
+                    (order.number, order_content_hash(order), printed_at)
+                    for order in orders
+                ),
+            )
+
+    def close(self):
+        self.connection.close()
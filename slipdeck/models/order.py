@@ -1,6 +1,6 @@
 from typing import List, Optional
 from enum import Enum, auto
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Marketplace(str, Enum):
@@ -17,6 +17,12 @@ class PageInfo(BaseModel):
     pdf_page: int
 
 
+class IndexedPage(BaseModel):
+    order_number: str
+    page_info: PageInfo
+    shipping_method: Optional[str] = None
+
+
 class ShippingAddress(BaseModel):
     name: str
     address_line1: str
@@ -53,6 +59,8 @@ class OrderInfo(BaseModel):
     cards: List[Card]
     sale_information: SaleInformation
     marketplace: Marketplace = Marketplace.TCGPLAYER
+    # Order total given by the marketplace, for orders whose cards have no prices
+    order_total: Optional[str] = None
 
 
 class Order(BaseModel):
@@ -60,3 +68,9 @@ class Order(BaseModel):
 
     number: str
     info: OrderInfo
+    # Every order number on the slip when orders to the same buyer were combined
+    combined_numbers: List[str] = Field(default_factory=list)
+
+    @property
+    def order_numbers(self) -> List[str]:
+        return self.combined_numbers or [self.number]
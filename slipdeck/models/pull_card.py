@@ -1,5 +1,9 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
+from slipdeck.inventory import InventoryLocation
+
 
 class PullCard(BaseModel):
     name: str
@@ -8,7 +12,7 @@ class PullCard(BaseModel):
     set: str
     rarity: str
     condition: str
-    price: str
+    price: Optional[str]
     quantity: int
-    quantity_text: str | None = None
     order_number: str
+    location: Optional[InventoryLocation] = None
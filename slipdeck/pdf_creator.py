@@ -1,12 +1,33 @@
+from contextlib import nullcontext
+import hashlib
+from io import BytesIO
+import json
+import os
 from pathlib import Path
+import shutil
 import tempfile
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from fpdf import FPDF
+from fpdf.errors import FPDFException
+from fpdf.image_datastructures import ImageCache
+from fpdf.image_parsing import preload_image
 from datetime import datetime
 from PyPDF2 import PdfWriter, PdfReader
-
+from PyPDF2.generic import IndirectObject, NameObject
+
+from slipdeck.barcodes import (
+    CODE128_QUIET_ZONE,
+    code128_bars,
+    draw_code128,
+    draw_qr_code,
+)
+from slipdeck.checkpoint import Checkpoint
+from slipdeck.inventory import InventoryIndex, natural_sort_key
 from slipdeck.models.order import Card, Marketplace, Order
+from slipdeck.progress import ProgressReporter
 from slipdeck.models.pull_card import PullCard
+from slipdeck.render_cache import RenderCache, render_cache_key
+from slipdeck.reprint import get_index_path, write_reprint_index
 from slipdeck.utilities.price_util import get_price_as_float
 
 NEW_LINE_HEIGHT = 0.1
@@ -19,15 +40,28 @@ STANDARD_FONT_SIZE = 6
 ENABLE_BORDERS = 1
 SHIP_TO_HEADER_FONT_SIZE = 12
 ORDER_NUM_HEADER_FONT_SIZE = 10
+LOGO_HEIGHT = 0.5
+LOGO_MAX_WIDTH = 2
+BARCODE_HEIGHT = 0.35
+# 2 dots per module on a 203 dpi thermal printer
+BARCODE_MODULE_WIDTH = 0.01
+QR_CODE_SIZE = 0.6
+# Bump whenever the packing slip layout changes so cached renders are not reused
+LAYOUT_VERSION = 3
 VARIANT_TYPES = ["Foil", "Holo", "Reverse", "Rare", "Promo", "Shiny", "Full Art"]
 
 
 class PullSheetPDF(FPDF):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, show_locations=False, **kwargs):
         super().__init__(*args, **kwargs)
         self.headers = ["Qty", "Description", "Price"]
         self.col_widths = [0.4, 2.8, 0.4]
         self.col_aligns = ["C", "L", "R"]
+        self.show_locations = show_locations
+        if show_locations:
+            self.headers.append("Location")
+            self.col_widths = [0.4, 2.2, 0.4, 0.6]
+            self.col_aligns.append("L")
         # Define colors for alternating rows
         self.even_row_color = (240, 240, 240)  # Light gray
         self.odd_row_color = (255, 255, 255)  # White
@@ -57,27 +91,35 @@ class PullSheetPDF(FPDF):
             )
         self.ln(NEW_LINE_HEIGHT)
 
-    def update_card_font_styles(self, card: PullCard):
-        self.update_card_count(card)
-        self.update_card_price(card)
-        self.update_card_description(card)
+    def get_card_font_styles(self, card: PullCard) -> Tuple[str, str, str]:
+        """
+        Markdown styled quantity, description and price of a card. The card
+        itself is left untouched, so the same cards can be rendered again.
+        """
+        return (
+            self.get_card_count_text(card),
+            self.get_card_description_text(card),
+            self.get_card_price_text(card),
+        )
 
-    def update_card_count(self, card: PullCard):
+    def get_card_count_text(self, card: PullCard) -> str:
         if card.quantity > 1:
-            card.quantity_text = f"--**{card.quantity}**"
-        else:
-            card.quantity_text = str(card.quantity)
+            return f"--**{card.quantity}**"
+        return str(card.quantity)
 
-    def update_card_price(self, card: PullCard):
+    def get_card_price_text(self, card: PullCard) -> str:
+        if not card.price:
+            return ""
         # Convert card.price to a float since it's a string then check if it's greater than 0.49
         if float(card.price[1:]) > 0.49:
-            card.price = f"--**{card.price}**--"
+            return f"--**{card.price}**--"
+        return card.price
 
-    def update_card_description(self, card: PullCard):
+    def get_card_description_text(self, card: PullCard) -> str:
         for variant in VARIANT_TYPES:
             if variant in card.description:
-                card.description = f"--**{card.description}**--"
-                return
+                return f"--**{card.description}**--"
+        return card.description
 
     def create_table(self, game_type: str, cards: list[PullCard]):
         self.add_page()
@@ -89,8 +131,8 @@ class PullSheetPDF(FPDF):
         self.set_font("Arial", "", STANDARD_FONT_SIZE)
 
         for card in cards:
-            self.update_card_font_styles(card)
-            row_lines = self.get_expected_row_lines(card.description)
+            quantity_text, description, price = self.get_card_font_styles(card)
+            row_lines = self.get_expected_row_lines(description)
 
             # Set background color for the row
             if self.row_count % 2 == 0:
@@ -101,7 +143,7 @@ class PullSheetPDF(FPDF):
             self.cell(
                 self.col_widths[0],
                 row_lines,
-                card.quantity_text,
+                quantity_text,
                 border=ENABLE_BORDERS,
                 align=self.col_aligns[0],
                 markdown=True,
@@ -110,7 +152,7 @@ class PullSheetPDF(FPDF):
             self.multi_cell(
                 self.col_widths[1],
                 NEW_LINE_HEIGHT,
-                card.description,
+                description,
                 border=ENABLE_BORDERS,
                 new_y="TOP",
                 max_line_height=NEW_LINE_HEIGHT,
@@ -121,12 +163,21 @@ class PullSheetPDF(FPDF):
             self.cell(
                 self.col_widths[2],
                 row_lines,
-                card.price,
+                price,
                 border=ENABLE_BORDERS,
                 align=self.col_aligns[2],
                 fill=True,
                 markdown=True,
             )
+            if self.show_locations:
+                self.cell(
+                    self.col_widths[3],
+                    row_lines,
+                    card.location.location if card.location is not None else "",
+                    border=ENABLE_BORDERS,
+                    align=self.col_aligns[3],
+                    fill=True,
+                )
             self.ln(row_lines)
             self.row_count += 1  # Increment row count
 
@@ -141,6 +192,31 @@ class PullSheetPDF(FPDF):
         )
 
 
+def get_card_total_text(card: Card) -> str:
+    """Total price of a card row, blank when the card has no price"""
+    if not card.Price:
+        return ""
+    return f"${get_price_as_float(card.Price) * float(card.Quantity):.2f}"
+
+
+def get_order_total_text(
+    cards: List[Card], order_total: Optional[str] = None
+) -> Optional[str]:
+    """
+    Total of an order: the marketplace's order total when it gave one, or the
+    sum of the card prices. None when neither is known, so no made up total
+    is printed.
+    """
+    if order_total:
+        return f"${get_price_as_float(order_total):.2f}"
+    if all(card.Price for card in cards):
+        total_price = sum(
+            get_price_as_float(card.Price) * float(card.Quantity) for card in cards
+        )
+        return f"${total_price:.2f}"
+    return None
+
+
 class OrderPDF(FPDF):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -210,8 +286,6 @@ class OrderPDF(FPDF):
         for card in cards:  # Process all cards except the last one
             row_lines = self.get_expected_row_lines(card.Description)
 
-            total_price = get_price_as_float(card.Price) * float(card.Quantity)
-
             self.cell(
                 self.col_widths[0],
                 row_lines,
@@ -231,44 +305,43 @@ class OrderPDF(FPDF):
             self.cell(
                 self.col_widths[2],
                 row_lines,
-                card.Price,
+                card.Price or "",
                 border=ENABLE_BORDERS,
                 align=self.col_aligns[2],
             )
             self.cell(
                 self.col_widths[3],
                 row_lines,
-                f"${total_price:.2f}",
+                get_card_total_text(card),
                 border=ENABLE_BORDERS,
                 align=self.col_aligns[3],
             )
             self.ln(row_lines)
 
-    def print_total_row(self, cards: List[Card]):
+    def print_total_row(self, cards: List[Card], order_total: Optional[str] = None):
         """Calculate totals from all cards"""
         self.ln(NEW_LINE_HEIGHT)
         total_row_width = self.w - 0.4
         self.set_font("Arial", "B", STANDARD_FONT_SIZE)
 
         total_quantity = sum(int(card.Quantity) for card in cards)
-        total_price = sum(
-            get_price_as_float(card.Price) * float(card.Quantity) for card in cards
-        )
+        total_text = get_order_total_text(cards, order_total)
 
         self.cell(
             total_row_width * 2 / 3,
             NEW_LINE_HEIGHT,
             f"Total Items: {total_quantity}",
         )
-        self.cell(
-            total_row_width * 1 / 3,
-            NEW_LINE_HEIGHT,
-            f"Total: ${total_price:.2f}",
-        )
+        if total_text is not None:
+            self.cell(
+                total_row_width * 1 / 3,
+                NEW_LINE_HEIGHT,
+                f"Total: {total_text}",
+            )
 
 
 def resize_image_to_height(
-    self, original_width, original_height, target_height_inches, dpi=300
+    original_width, original_height, target_height_inches, dpi=300
 ):
     """
     Calculate dimensions to resize an image to a target height while maintaining aspect ratio
@@ -315,6 +388,55 @@ def get_proportional_image_height(image_path: str, target_width: float):
         return new_height
 
 
+class Logo:
+    """
+    Shop logo decoded and resized once per run.
+
+    The image is preloaded into an fpdf image cache that every OrderPDF shares,
+    so each slip only references it by name instead of re-reading and
+    re-encoding it.
+    """
+
+    def __init__(self, image, width: float, height: float):
+        self.image = image
+        self.width = width
+        self.height = height
+        self.image_cache = ImageCache()
+        self.name, _, _ = preload_image(self.image_cache, image)
+
+    def draw(self, pdf: FPDF):
+        pdf.image_cache = self.image_cache
+        x = (pdf.w - self.width) / 2
+        pdf.image(self.name, x=x, y=pdf.t_margin, w=self.width, h=self.height)
+        pdf.set_y(pdf.t_margin + self.height + NEW_LINE_HEIGHT)
+
+
+def load_logo(
+    image_path: str, target_height=LOGO_HEIGHT, max_width=LOGO_MAX_WIDTH, dpi=300
+) -> Logo:
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        width_px, height_px, width, height = resize_image_to_height(
+            img.width, img.height, target_height, dpi
+        )
+        if width > max_width:
+            width_px, height_px, width, height = resize_image_to_height(
+                img.width,
+                img.height,
+                get_proportional_image_height(image_path, max_width),
+                dpi,
+            )
+
+        # Thermal printers are monochrome, so grayscale keeps the embedded image small
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        image = img.convert("LA" if has_alpha else "L")
+        if width_px < img.width:
+            image = image.resize((width_px, height_px), Image.LANCZOS)
+
+    return Logo(image, width, height)
+
+
 def print_shipping_to_header(pdf, shipping_address):
     pdf.set_font("Arial", "B", SHIP_TO_HEADER_FONT_SIZE)
 
@@ -327,114 +449,567 @@ def print_shipping_to_header(pdf, shipping_address):
     pdf.cell(text=shipping_address.city_state_zip, ln=True)
 
 
+def print_order_barcodes(pdf: OrderPDF, order_number: str, qr_code=False):
+    """Draw the order number as a Code 128 barcode, and a QR code on its right"""
+    x, y = pdf.l_margin, pdf.get_y()
+    available_width = pdf.epw - (QR_CODE_SIZE + NEW_LINE_HEIGHT if qr_code else 0)
+    _, modules = code128_bars(order_number)
+    # Keep the quiet zone scanners need clear on both sides of the bars
+    module_width = min(
+        BARCODE_MODULE_WIDTH, available_width / (modules + 2 * CODE128_QUIET_ZONE)
+    )
+    draw_code128(
+        pdf,
+        order_number,
+        x + CODE128_QUIET_ZONE * module_width,
+        y,
+        BARCODE_HEIGHT,
+        module_width,
+    )
+
+    row_height = BARCODE_HEIGHT
+    if qr_code:
+        draw_qr_code(pdf, order_number, x + pdf.epw - QR_CODE_SIZE, y, QR_CODE_SIZE)
+        row_height = QR_CODE_SIZE
+    pdf.set_y(y + row_height)
+
+
+def build_order_pdf(
+    order: Order,
+    company_name,
+    marketplace: Marketplace,
+    logo: Optional[Logo] = None,
+    qr_code=False,
+) -> OrderPDF:
+    pdf = OrderPDF(orientation="P", unit="in", format=(PAGE_WIDTH, PAGE_HEIGHT))
+    pdf.alias_nb_pages()
+    pdf.set_auto_page_break(auto=True, margin=BOTTOM_MARGIN)
+    pdf.set_margins(HORIZONTAL_MARGIN, TOP_MARGIN)
+    pdf.add_page(print_table_headers=False)
+    pdf.start_new_order(order.number, order.info)
+
+    if logo is not None:
+        logo.draw(pdf)
+
+    shipping_address = order.info.shipping_address
+    print_shipping_to_header(pdf, shipping_address)
+
+    pdf.ln(NEW_LINE_HEIGHT)
+
+    pdf.draw_full_dashed_line()
+
+    pdf.ln(NEW_LINE_HEIGHT)
+
+    # Print order number
+    pdf.set_font("Arial", "B", ORDER_NUM_HEADER_FONT_SIZE)
+    if order.combined_numbers:
+        pdf.cell(text=f"Orders ({len(order.combined_numbers)}):", ln=True)
+        for order_number in order.combined_numbers:
+            pdf.cell(text=order_number, ln=True)
+    else:
+        pdf.cell(text=f"Order: {order.number}", ln=True)
+
+    pdf.ln(NEW_LINE_HEIGHT / 2)
+
+    print_order_barcodes(pdf, order.number, qr_code)
+
+    pdf.ln(NEW_LINE_HEIGHT / 2)
+
+    pdf.set_font("Arial", "", STANDARD_FONT_SIZE)
+    pdf.cell(
+        text=f"Thank you for buying from **{company_name}** on {marketplace.value}.",
+        ln=True,
+        markdown=True,
+    )
+    pdf.ln(NEW_LINE_HEIGHT / 3)
+
+    cards = order.info.cards
+
+    pdf.print_table_headers()
+
+    pdf.create_cards_table(cards)
+    pdf.print_total_row(cards, order.info.order_total)
+
+    return pdf
+
+
+def render_order_pdf(
+    pdf_path,
+    order: Order,
+    company_name,
+    marketplace: Marketplace,
+    logo: Optional[Logo] = None,
+    qr_code=False,
+):
+    pdf = build_order_pdf(order, company_name, marketplace, logo, qr_code)
+
+    # Write next to the target first so a resumed run never sees a partial file
+    tmp_path = Path(f"{pdf_path}.tmp")
+    pdf.output(str(tmp_path))
+    os.replace(tmp_path, pdf_path)
+
+
+def render_order_pdf_bytes(
+    order: Order,
+    company_name,
+    marketplace: Marketplace,
+    logo: Optional[Logo] = None,
+    qr_code=False,
+):
+    return bytes(
+        build_order_pdf(order, company_name, marketplace, logo, qr_code).output()
+    )
+
+
+def get_slip_cache_key(
+    order: Order,
+    company_name,
+    marketplace: Marketplace,
+    logo: Optional[Logo] = None,
+    qr_code=False,
+) -> str:
+    layout_options = {}
+    if logo is not None:
+        layout_options["logo"] = logo.name
+    if qr_code:
+        layout_options["qr_code"] = True
+    return render_cache_key(
+        order, company_name, marketplace, LAYOUT_VERSION, layout_options
+    )
+
+
+def get_order_pdf(
+    order: Order,
+    tmp_dir,
+    company_name,
+    marketplace: Marketplace,
+    checkpoint: Optional[Checkpoint] = None,
+    render_cache: Optional[RenderCache] = None,
+    logo: Optional[Logo] = None,
+    qr_code=False,
+) -> Optional[Path]:
+    """
+    Return the packing slip PDF of an order, rendering it only when neither the
+    checkpoint nor the render cache already has it. Returns None if the order
+    failed to render and was quarantined.
+
+    Slips are named by their render cache key, so a slip kept from an earlier
+    run is only reused when everything printed on it is unchanged.
+    """
+    cache_key = get_slip_cache_key(order, company_name, marketplace, logo, qr_code)
+    pdf_path = Path(tmp_dir) / f"{cache_key}.pdf"
+    if pdf_path.exists():
+        return pdf_path
+
+    if render_cache is not None:
+        cached_pdf_path = render_cache.lookup(cache_key)
+        if cached_pdf_path is not None:
+            return cached_pdf_path
+
+    try:
+        render_order_pdf(pdf_path, order, company_name, marketplace, logo, qr_code)
+    except (ValueError, IndexError, KeyError, FPDFException) as e:
+        if checkpoint is None:
+            raise
+        for order_number in order.order_numbers:
+            checkpoint.quarantine("render", repr(e), order_number)
+        return None
+
+    if render_cache is not None:
+        render_cache.store(cache_key, pdf_path)
+    return pdf_path
+
+
 def create_order_pdf(
     orders: List[Order],
     output_dir,
     company_name,
     marketplace: Marketplace,
-    progress=None,
-    task_id=None,
+    progress: Optional[ProgressReporter] = None,
     archive_each_order_pack_slip=False,
+    checkpoint: Optional[Checkpoint] = None,
+    render_cache: Optional[RenderCache] = None,
+    chunk_size: Optional[int] = None,
+    write_manifest=False,
+    logo: Optional[Logo] = None,
+    qr_code=False,
 ):
-    if progress is not None and task_id is not None:
-        progress.update(task_id, total=len(orders))
-
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        for order in orders:
-            pdf = OrderPDF(orientation="P", unit="in", format=(PAGE_WIDTH, PAGE_HEIGHT))
-            pdf.alias_nb_pages()
-            pdf.set_auto_page_break(auto=True, margin=BOTTOM_MARGIN)
-            pdf.set_margins(HORIZONTAL_MARGIN, TOP_MARGIN)
-            pdf.add_page(print_table_headers=False)
-            pdf.start_new_order(order.number, order.info)
+    """
+    Render a packing slip per order and merge them into a single PDF.
 
-            shipping_address = order.info.shipping_address
-            print_shipping_to_header(pdf, shipping_address)
+    When the checkpoint is backed by a directory the individual slips are kept
+    there, so orders rendered by an interrupted run are not rendered again.
+    Orders that fail to render are quarantined in the checkpoint.
 
-            pdf.ln(NEW_LINE_HEIGHT)
+    Orders found in the render cache are merged straight from their cached
+    PDF instead of being drawn again.
 
-            pdf.draw_full_dashed_line()
+    With a chunk_size the merged output is split into numbered parts of that
+    many orders, each written as soon as its orders are rendered so printing
+    can start early, and the list of part paths is returned. write_manifest
+    adds a JSON manifest of the parts that is updated as each one lands.
+    """
+    if progress is not None:
+        progress.start_stage("render", "Creating PDFs", "orders", total=len(orders))
+
+    pdf_type = f"{marketplace.value}_PackingSlips"
+    timestamp = datetime.now().strftime("%m%d%Y-%H%M")
+    if chunk_size:
+        # Cut the parts in merge order so together they match a single batch
+        orders = sorted(orders, key=lambda order: order.number)
+    manifest_path = (
+        Path(output_dir) / f"{pdf_type}_{timestamp}_manifest.json"
+        if chunk_size and write_manifest
+        else None
+    )
 
-            pdf.ln(NEW_LINE_HEIGHT)
+    render_dir = checkpoint.render_dir if checkpoint is not None else None
+    with (
+        tempfile.TemporaryDirectory()
+        if render_dir is None
+        else nullcontext(str(render_dir))
+    ) as tmp_dir:
+        order_pdfs: Dict[str, Path] = {}
+        chunk_pdfs: Dict[str, Path] = {}
+        combined_numbers: Dict[str, List[str]] = {}
+        part_paths: List[Path] = []
+        manifest_parts = []
+        for i, order in enumerate(orders, start=1):
+            pdf_path = get_order_pdf(
+                order,
+                tmp_dir,
+                company_name,
+                marketplace,
+                checkpoint,
+                render_cache,
+                logo,
+                qr_code,
+            )
+            if pdf_path is not None:
+                order_pdfs[order.number] = pdf_path
+                chunk_pdfs[order.number] = pdf_path
+                if order.combined_numbers:
+                    combined_numbers[order.number] = order.combined_numbers
+
+            if chunk_size and (i % chunk_size == 0 or i == len(orders)):
+                part_path = write_merged_pdf(
+                    chunk_pdfs,
+                    output_dir,
+                    merged_pdf_path=Path(output_dir)
+                    / f"{pdf_type}_{timestamp}_part{len(part_paths) + 1:03d}.pdf",
+                    combined_numbers=combined_numbers,
+                )
+                part_paths.append(part_path)
+                if manifest_path is not None:
+                    manifest_parts.append(
+                        {
+                            "file": part_path.name,
+                            "index": get_index_path(part_path).name,
+                            "orders": sorted(
+                                order_number
+                                for number in chunk_pdfs
+                                for order_number in combined_numbers.get(
+                                    number, [number]
+                                )
+                            ),
+                        }
+                    )
+                    write_chunk_manifest(
+                        manifest_path, manifest_parts, complete=i == len(orders)
+                    )
+                chunk_pdfs = {}
+
+            if progress is not None:
+                # Only chunked output has a queue: rendered slips waiting for
+                # their part to be written. Otherwise every slip waits for the
+                # single merge at the end, which is just the completed count.
+                progress.advance(
+                    "render", queue_depth=len(chunk_pdfs) if chunk_size else None
+                )
+
+        if chunk_size:
+            merged_pdf_path = part_paths
+        else:
+            merged_pdf_path = write_merged_pdf(
+                order_pdfs, output_dir, pdf_type, combined_numbers=combined_numbers
+            )
 
-            # Print order number
-            pdf.set_font("Arial", "B", ORDER_NUM_HEADER_FONT_SIZE)
-            pdf.cell(text=f"Order: {order.number}", ln=True)
+        # Copy all pdfs to the output directory
+        if archive_each_order_pack_slip:
+            for order_number, pdf_file in order_pdfs.items():
+                shutil.copyfile(pdf_file, Path(output_dir) / f"{order_number}.pdf")
 
-            pdf.ln(NEW_LINE_HEIGHT / 2)
+        if render_cache is not None:
+            render_cache.trim()
 
-            pdf.set_font("Arial", "", STANDARD_FONT_SIZE)
-            pdf.cell(
-                text=f"Thank you for buying from **{company_name}** on {marketplace.value}.",
-                ln=True,
-                markdown=True,
+        if progress is not None:
+            progress.end_stage(
+                "render", f"Merged packing slips successfully in {output_dir}"
             )
-            pdf.ln(NEW_LINE_HEIGHT / 3)
 
-            cards = order.info.cards
+    return merged_pdf_path
 
-            pdf.print_table_headers()
 
-            pdf.create_cards_table(cards)
-            pdf.print_total_row(cards)
+def write_chunk_manifest(manifest_path: Path, parts: List[dict], complete: bool):
+    tmp_path = manifest_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"complete": complete, "parts": parts}, indent=2))
+    os.replace(tmp_path, manifest_path)
 
-            pdf.output(f"{tmp_dir}/{order.number}.pdf")
 
-            if progress is not None and task_id is not None:
-                progress.update(task_id, advance=1)
+def merge_pdf_sources(sources: Iterable[Tuple[str, Any]]):
+    """
+    Append the pages of each (order number, PDF path or stream) source.
 
-        merge_pdfs(tmp_dir, output_dir, f"{marketplace.value}_PackingSlips")
+    Returns the writer and the 1-based (first, last) page range of each order.
+    """
+    pdf_writer = PdfWriter()
+    page_ranges: Dict[str, Tuple[int, int]] = {}
+    shared_images: Dict[str, IndirectObject] = {}
 
-        # Copy all pdfs to the output directory
-        if archive_each_order_pack_slip:
-            for pdf_file in Path(tmp_dir).glob("*.pdf"):
-                pdf_file.rename(Path(output_dir) / pdf_file.name)
+    for order_number, source in sources:
+        pdf_reader = PdfReader(source)
+        start_page = len(pdf_writer.pages) + 1
+        for page in pdf_reader.pages:
+            new_images = share_identical_images(page, pdf_writer, shared_images)
+            merged_page = pdf_writer.add_page(page)
+            if new_images:
+                xobjects = merged_page["/Resources"]["/XObject"]
+                for image_hash, name in new_images.items():
+                    shared_images[image_hash] = xobjects.raw_get(name)
+        page_ranges[order_number] = (start_page, len(pdf_writer.pages))
 
-        progress.update(
-            task_id,
-            description=f":white_heavy_check_mark: [green]Merged packing slips successfully in {output_dir}!",
-        )
+    return pdf_writer, page_ranges
+
+
+def get_image_hash(image) -> str:
+    """
+    Hash of an image XObject that is the same in every source PDF.
+
+    Covers the image dictionary without its indirect references, whose object
+    numbers differ between slips, the still encoded stream data, so nothing
+    is decompressed just to compare images, and the hash of its soft mask.
+    """
+    image_hash = hashlib.sha256()
+    for key in sorted(image.keys()):
+        value = image.raw_get(key)
+        if isinstance(value, IndirectObject):
+            continue
+        buffer = BytesIO()
+        value.write_to_stream(buffer, None)
+        image_hash.update(key.encode() + b" " + buffer.getvalue() + b"\n")
+
+    buffer = BytesIO()
+    image.write_to_stream(buffer, None)
+    # The serialized dictionary never contains a bare "stream" line
+    image_hash.update(buffer.getvalue().split(b"\nstream\n", 1)[1])
+
+    if "/SMask" in image:
+        image_hash.update(get_image_hash(image["/SMask"].get_object()).encode())
+    return image_hash.hexdigest()
+
+
+def share_identical_images(
+    page, pdf_writer: PdfWriter, shared_images: Dict[str, IndirectObject]
+) -> Dict[str, str]:
+    """
+    Point the page's image XObjects at identical images already copied into the
+    writer, so an image repeated on every slip (like the logo) is stored once.
+
+    Returns the hash and resource name of the images that still need copying.
+    """
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources else None
+    if not xobjects:
+        return {}
+
+    xobjects = xobjects.get_object()
+    new_images = {}
+    for name in list(xobjects.keys()):
+        reference = xobjects.raw_get(name)
+        if not isinstance(reference, IndirectObject) or reference.pdf is pdf_writer:
+            continue
+        xobject = reference.get_object()
+        if xobject.get("/Subtype") != "/Image":
+            continue
+
+        image_hash = get_image_hash(xobject)
+
+        if image_hash in shared_images:
+            xobjects[NameObject(name)] = shared_images[image_hash]
+        else:
+            new_images[image_hash] = name
+
+    return new_images
 
 
 def merge_pdfs(tmp_dir: str, output_dir: str, pdf_type="TCGPlayer_PackingSlips"):
-    pdf_writer = PdfWriter()
-    pdf_files = sorted(Path(tmp_dir).glob("*.pdf"))
+    return write_merged_pdf(
+        {pdf_file.stem: pdf_file for pdf_file in Path(tmp_dir).glob("*.pdf")},
+        output_dir,
+        pdf_type,
+    )
 
-    for pdf_file in pdf_files:
-        pdf_reader = PdfReader(str(pdf_file))
-        for page in pdf_reader.pages:
-            pdf_writer.add_page(page)
 
-    merged_pdf_path = (
-        Path(output_dir)
-        / f"{pdf_type}_{len(pdf_files)}_Orders_{datetime.now().strftime('%m%d%Y-%H%M')}.pdf"
+def write_merged_pdf(
+    order_pdfs: Dict[str, Path],
+    output_dir,
+    pdf_type="TCGPlayer_PackingSlips",
+    merged_pdf_path: Optional[Path] = None,
+    combined_numbers: Optional[Dict[str, List[str]]] = None,
+):
+    """
+    Merge the slip of each order, ordered by order number, plus its reprint index.
+
+    combined_numbers maps the slips of combined orders to all their order
+    numbers, so each of them can be found in the index.
+    """
+    pdf_writer, page_ranges = merge_pdf_sources(
+        (order_number, str(order_pdfs[order_number]))
+        for order_number in sorted(order_pdfs)
     )
-    with open(merged_pdf_path, "wb") as f:
+    for order_number, numbers in (combined_numbers or {}).items():
+        if order_number in page_ranges:
+            for number in numbers:
+                page_ranges[number] = page_ranges[order_number]
+
+    if merged_pdf_path is None:
+        merged_pdf_path = (
+            Path(output_dir)
+            / f"{pdf_type}_{len(order_pdfs)}_Orders_{datetime.now().strftime('%m%d%Y-%H%M')}.pdf"
+        )
+    # Only expose complete files to printers and tools watching the directory
+    tmp_path = merged_pdf_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
         pdf_writer.write(f)
+    os.replace(tmp_path, merged_pdf_path)
+
+    write_reprint_index(merged_pdf_path, page_ranges)
 
     return merged_pdf_path
 
 
-def create_pull_sheet(
-    magic_cards: List[Card],
-    pokemon_cards: List[Card],
-    misc_cards: List[Card],
-    output_dir,
-):
-    pdf = PullSheetPDF(orientation="P", unit="in", format=(PAGE_WIDTH, PAGE_HEIGHT))
+def merge_pdf_bytes(rendered_orders: Dict[str, bytes]) -> bytes:
+    """Merge in-memory order slips, ordered by order number like merge_pdfs"""
+    pdf_writer, _ = merge_pdf_sources(
+        (order_number, BytesIO(rendered_orders[order_number]))
+        for order_number in sorted(rendered_orders)
+    )
+    stream = BytesIO()
+    pdf_writer.write(stream)
+    return stream.getvalue()
+
+
+def group_pull_cards(
+    orders: List[Order],
+    inventory: Optional[InventoryIndex] = None,
+) -> Tuple[List[PullCard], List[PullCard], List[PullCard]]:
+    """
+    Combine the cards of all orders into Magic, Pokemon and misc pull lists.
+
+    With an inventory index every distinct card gets its shelf location.
+    """
+    magic_cards: List[PullCard] = []
+    pokemon_cards: List[PullCard] = []
+    misc_cards: List[PullCard] = []
+    pull_cards: Dict[Tuple[int, str], PullCard] = {}
+
+    for order in orders:
+        for card in order.info.cards:
+            if card.product_line == "Magic":
+                game_cards = magic_cards
+            elif card.product_line.startswith("Pokemon"):
+                game_cards = pokemon_cards
+            else:
+                game_cards = misc_cards
+
+            card_name = f"{card.set} {card.name} {card.number}"
+            key = (id(game_cards), card_name)
+            if key in pull_cards:
+                # Get existing card and update quantity and order info
+                existing_card = pull_cards[key]
+                existing_card.quantity += int(card.Quantity)
+                existing_card.order_number += f", {order.number}"
+            else:
+                new_card = PullCard(
+                    name=card_name,
+                    description=card.Description,
+                    number=card.number,
+                    set=card.set,
+                    rarity=card.rarity,
+                    condition=card.condition,
+                    price=card.Price,
+                    quantity=card.Quantity,
+                    order_number=order.number,
+                    location=(
+                        inventory.lookup(card.set, card.number)
+                        if inventory is not None
+                        else None
+                    ),
+                )
+                pull_cards[key] = new_card
+                game_cards.append(new_card)
+
+    return magic_cards, pokemon_cards, misc_cards
+
+
+def pull_card_sort_key(card: PullCard):
+    """Cards with a shelf location first, in bin and slot order"""
+    return (
+        card.location is None,
+        card.location.sort_key if card.location is not None else (),
+        card.set,
+        # The pull card name ends with the card number, so collate it naturally
+        natural_sort_key(card.name),
+        card.rarity,
+    )
+
+
+def build_pull_sheet_pdf(
+    magic_cards: List[PullCard],
+    pokemon_cards: List[PullCard],
+    misc_cards: List[PullCard],
+) -> PullSheetPDF:
+    show_locations = any(
+        card.location is not None
+        for cards in (magic_cards, pokemon_cards, misc_cards)
+        for card in cards
+    )
+    pdf = PullSheetPDF(
+        orientation="P",
+        unit="in",
+        format=(PAGE_WIDTH, PAGE_HEIGHT),
+        show_locations=show_locations,
+    )
     pdf.alias_nb_pages()
     pdf.set_auto_page_break(auto=True, margin=BOTTOM_MARGIN)
     pdf.set_margins(HORIZONTAL_MARGIN, TOP_MARGIN)
 
-    # Sort by set then name
-    magic_cards.sort(key=lambda x: (x.set, x.name, x.number, x.rarity))
-    pokemon_cards.sort(key=lambda x: (x.set, x.name, x.number, x.rarity))
-    misc_cards.sort(key=lambda x: (x.set, x.name, x.number, x.rarity))
+    # Sort by shelf location when known, then by set and name, leaving the
+    # caller's lists in their original order
+    pdf.create_table("Magic", sorted(magic_cards, key=pull_card_sort_key))
+    pdf.create_table("Pokemon", sorted(pokemon_cards, key=pull_card_sort_key))
+    pdf.create_table("MISC.", sorted(misc_cards, key=pull_card_sort_key))
 
-    pdf.create_table("Magic", magic_cards)
-    pdf.create_table("Pokemon", pokemon_cards)
-    pdf.create_table("MISC.", misc_cards)
+    return pdf
 
-    pdf.output(
+
+def create_pull_sheet(
+    magic_cards: List[PullCard],
+    pokemon_cards: List[PullCard],
+    misc_cards: List[PullCard],
+    output_dir,
+):
+    pdf = build_pull_sheet_pdf(magic_cards, pokemon_cards, misc_cards)
+    pull_sheet_path = (
         f"{output_dir}/TCGPlayer_PullList_{datetime.now().strftime('%m%d%Y-%H%M')}.pdf"
     )
+    pdf.output(pull_sheet_path)
+    return pull_sheet_path
+
+
+def render_pull_sheet_bytes(
+    magic_cards: List[PullCard],
+    pokemon_cards: List[PullCard],
+    misc_cards: List[PullCard],
+) -> bytes:
+    return bytes(build_pull_sheet_pdf(magic_cards, pokemon_cards, misc_cards).output())
@@ -1,26 +1,55 @@
 import re
-from typing import List
+from typing import (
+    BinaryIO,
+    Collection,
+    Container,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Union,
+)
 import pdfplumber
 
+from slipdeck.checkpoint import Checkpoint
+
 from slipdeck.models.order import (
     Card,
+    IndexedPage,
     Marketplace,
     Order,
     OrderInfo,
     PageInfo,
     SaleInformation,
 )
+from slipdeck.progress import ProgressReporter
+
+SHIP_TO_PATTERN = re.compile(r"ShipTo:(.*?)Order Number", re.DOTALL)
+ORDER_INFO_PATTERN = re.compile(
+    r"OrderNumber:(?P<order_number>\S+)\s+Page(?P<page>\d+)of(?P<total>\d+)"
+)
+# Bottom of the page region holding the order number and page X of Y
+HEADER_REGION_BOTTOM = 282
+SALE_INFORMATION_PATTERN = re.compile(
+    r"Order Date:\s*(?P<order_date>.+?)\s*\n"
+    r"Shipping Method:\s*(?P<shipping_method>.+?)\s*\n"
+    r"Buyer Name:\s*(?P<buyer_name>.+?)\s*\n"
+    r"Seller Name:\s*(?P<seller_name>.+)",
+    re.DOTALL | re.IGNORECASE,
+)
 
 
-def debug_print(text: str, progress=None):
+def debug_print(text: str, progress: Optional[ProgressReporter] = None):
+    """
+    Report text through the progress reporter. Without one it is dropped, so
+    library callers never get output on their stdout.
+    """
     if progress is not None:
-        progress.console.print(text)
-    else:
-        print(text)
+        progress.log(text)
 
 
 def extract_ship_to(text: str) -> dict:
-    ship_to_match = re.search(r"ShipTo:(.*?)Order Number", text, re.DOTALL)
+    ship_to_match = SHIP_TO_PATTERN.search(text)
     if ship_to_match:
         ship_to_text = ship_to_match.group(1).strip()
         lines = ship_to_text.splitlines()
@@ -140,68 +169,250 @@ def extract_cards(page: pdfplumber.page.Page) -> List[Card]:
 
 
 def parse_packing_slips(
-    pdf_path: str, marketplace: Marketplace, progress=None, task_id=None
+    pdf_path: Union[str, BinaryIO],
+    marketplace: Marketplace,
+    progress: Optional[ProgressReporter] = None,
+    skip_orders: Optional[Container[str]] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    selected_orders: Optional[Collection[str]] = None,
+    shipping_method: Optional[str] = None,
 ) -> List[Order]:
-    orders: List[Order] = []
-    order_info_pattern = re.compile(
-        r"OrderNumber:(?P<order_number>\S+)\s+Page(?P<page>\d+)of(?P<total>\d+)"
-    )
+    """
+    Parse every packing slip page of a PDF path or binary stream into orders.
+
+    Pages belonging to an order number found in skip_orders (e.g. an
+    OrderLedger of already printed orders) are skipped before any table
+    extraction happens.
+
+    selected_orders and shipping_method limit parsing to the matching orders.
+    Their pages are found with a cheap header-only index pass first, so
+    nothing else is extracted from the other pages.
+
+    A page that fails to parse quarantines its whole order in the checkpoint
+    instead of aborting the run. When the checkpoint is backed by a directory,
+    parsing resumes after the last saved page.
+    """
+    checkpoint = checkpoint if checkpoint is not None else Checkpoint()
+    orders: List[Order] = checkpoint.state.orders
+    orders_by_number = {order.number: order for order in orders}
+    quarantined_orders = set(checkpoint.state.quarantined_orders)
+    skipped_orders = set()
     with pdfplumber.open(pdf_path) as pdf:
-        # Update the total progress with the number of pages
-        if progress is not None and task_id is not None:
-            progress.update(task_id, total=len(pdf.pages))
-        for i, page in enumerate(pdf.pages):
-            text = page.extract_text()
+        page_count = len(pdf.pages)
+        start_page = (
+            page_count
+            if checkpoint.state.parsing_complete
+            else checkpoint.state.next_page
+        )
+        selected_pages = None
+        if selected_orders is not None or shipping_method is not None:
+            selected_pages = select_pages(
+                build_page_index(pdf, include_shipping_method=bool(shipping_method)),
+                selected_orders,
+                shipping_method,
+            )
+
+        if progress is not None:
+            progress.start_stage(
+                "parse",
+                "Parsing PDF and processing orders",
+                "pages",
+                total=page_count,
+                completed=start_page,
+            )
+        for i in range(start_page, page_count):
+            if selected_pages is not None and i + 1 not in selected_pages:
+                checkpoint.page_done(i)
+                if progress is not None:
+                    progress.advance("parse", orders=len(orders))
+                continue
+
+            page = pdf.pages[i]
+            text = page.extract_text() or ""
 
             # Extract order information
-            order_info_match = order_info_pattern.search(text)
+            order_info_match = ORDER_INFO_PATTERN.search(text)
             if order_info_match:
                 order_number = order_info_match.group("order_number")
-                page_info_item = PageInfo(
-                    page=int(order_info_match.group("page")),
-                    total_pages=int(order_info_match.group("total")),
-                    pdf_page=i + 1,
-                )
-                ship_to_data = extract_ship_to(text)
-                cards = extract_cards(page)
+                if skip_orders is not None and (
+                    order_number in skipped_orders or order_number in skip_orders
+                ):
+                    skipped_orders.add(order_number)
+                elif order_number in quarantined_orders:
+                    checkpoint.quarantine(
+                        "parse",
+                        "Skipped because another page of this order failed",
+                        order_number,
+                        i + 1,
+                    )
+                else:
+                    try:
+                        add_page_to_orders(
+                            page,
+                            text,
+                            order_info_match,
+                            i + 1,
+                            orders,
+                            orders_by_number,
+                            marketplace,
+                        )
+                    except (ValueError, IndexError, KeyError) as e:
+                        debug_print(
+                            f"Quarantined order {order_number}: page {i + 1} failed to parse ({e!r})",
+                            progress,
+                        )
+                        failed_order = orders_by_number.pop(order_number, None)
+                        if failed_order is not None:
+                            orders.remove(failed_order)
+                        quarantined_orders.add(order_number)
+                        checkpoint.quarantine("parse", repr(e), order_number, i + 1)
+
+            # Release the cached layout objects of pages we are done with
+            page.close()
+            checkpoint.page_done(i)
+
+            if progress is not None:
+                progress.advance("parse", orders=len(orders))
+
+        checkpoint.state.parsing_complete = True
+        checkpoint.save()
+
+        if progress is not None:
+            skipped_text = (
+                f" (skipped {len(skipped_orders)} already printed)"
+                if skipped_orders
+                else ""
+            )
+            progress.end_stage(
+                "parse",
+                f"Processed {len(orders)} orders{skipped_text}",
+                orders=len(orders),
+            )
+        return orders
+
 
-                existing_order = next(
-                    (order for order in orders if order.number == order_number),
-                    None,
+def build_page_index(
+    pdf: pdfplumber.PDF, include_shipping_method=False
+) -> List[IndexedPage]:
+    """
+    Map pages to their order number and page X of Y from the header region
+    only, without extracting the ship-to block or the card table.
+
+    With include_shipping_method the sale information box of each order's
+    first page is read as well.
+    """
+    index: List[IndexedPage] = []
+    for i, page in enumerate(pdf.pages):
+        header = page.crop((0, 0, page.width, min(HEADER_REGION_BOTTOM, page.height)))
+        order_info_match = ORDER_INFO_PATTERN.search(header.extract_text() or "")
+        if not order_info_match:
+            # Fall back to the whole page for unexpected layouts
+            order_info_match = ORDER_INFO_PATTERN.search(page.extract_text() or "")
+
+        if order_info_match:
+            page_info = PageInfo(
+                page=int(order_info_match.group("page")),
+                total_pages=int(order_info_match.group("total")),
+                pdf_page=i + 1,
+            )
+            order_shipping_method = None
+            if include_shipping_method and page_info.page == 1:
+                try:
+                    order_shipping_method = extract_sale_information(
+                        page
+                    ).shipping_method
+                except ValueError:
+                    pass
+            index.append(
+                IndexedPage(
+                    order_number=order_info_match.group("order_number"),
+                    page_info=page_info,
+                    shipping_method=order_shipping_method,
                 )
+            )
+        page.close()
 
-                if existing_order:
-                    order_info = existing_order.info
-                    order_info.cards.extend(cards)
+    return index
+
+
+def index_packing_slips(
+    pdf_path: Union[str, BinaryIO], include_shipping_method=False
+) -> List[IndexedPage]:
+    with pdfplumber.open(pdf_path) as pdf:
+        return build_page_index(pdf, include_shipping_method)
+
+
+def select_pages(
+    index: List[IndexedPage],
+    selected_orders: Optional[Collection[str]] = None,
+    shipping_method: Optional[str] = None,
+) -> Set[int]:
+    """
+    Return the PDF page numbers of the orders that are in selected_orders and
+    whose shipping method contains shipping_method (case insensitive).
+    """
+    order_numbers = {entry.order_number for entry in index}
+    if selected_orders is not None:
+        order_numbers &= set(selected_orders)
+    if shipping_method:
+        shipping_method = shipping_method.lower()
+        order_numbers &= {
+            entry.order_number
+            for entry in index
+            if entry.shipping_method
+            and shipping_method in entry.shipping_method.lower()
+        }
+
+    return {
+        entry.page_info.pdf_page
+        for entry in index
+        if entry.order_number in order_numbers
+    }
 
-                    if not order_info.shipping_address and ship_to_data:
-                        order_info.shipping_address = ship_to_data
-                    existing_order.info.page_info.append(page_info_item)
-                else:
-                    # First page of order
-                    sale_information = extract_sale_information(page)
-
-                    orders.append(
-                        Order(
-                            number=order_number,
-                            info=OrderInfo(
-                                page_info=[page_info_item],
-                                shipping_address=ship_to_data,
-                                cards=cards,
-                                sale_information=sale_information,
-                                marketplace=marketplace,
-                            ),
-                        )
-                    )
 
-            if progress is not None and task_id is not None:
-                progress.update(task_id, advance=1)
+def add_page_to_orders(
+    page: pdfplumber.page.Page,
+    text: str,
+    order_info_match: re.Match,
+    pdf_page: int,
+    orders: List[Order],
+    orders_by_number: Dict[str, Order],
+    marketplace: Marketplace,
+):
+    order_number = order_info_match.group("order_number")
+    page_info_item = PageInfo(
+        page=int(order_info_match.group("page")),
+        total_pages=int(order_info_match.group("total")),
+        pdf_page=pdf_page,
+    )
+    ship_to_data = extract_ship_to(text)
+    cards = extract_cards(page)
 
-        progress.update(
-            task_id,
-            description=f"[green]:white_heavy_check_mark: Processed {len(orders)} orders!",
+    existing_order = orders_by_number.get(order_number)
+
+    if existing_order:
+        order_info = existing_order.info
+        order_info.cards.extend(cards)
+
+        if not order_info.shipping_address and ship_to_data:
+            order_info.shipping_address = ship_to_data
+        existing_order.info.page_info.append(page_info_item)
+    else:
+        # First page of order
+        sale_information = extract_sale_information(page)
+
+        order = Order(
+            number=order_number,
+            info=OrderInfo(
+                page_info=[page_info_item],
+                shipping_address=ship_to_data,
+                cards=cards,
+                sale_information=sale_information,
+                marketplace=marketplace,
+            ),
         )
-        return orders
+        orders.append(order)
+        orders_by_number[order_number] = order
 
 
 def extract_sale_information(page: pdfplumber.page.Page) -> SaleInformation:
@@ -215,14 +426,7 @@ def extract_sale_information(page: pdfplumber.page.Page) -> SaleInformation:
     box = page.within_bbox(bbox)
     box_text = box.extract_text(x_tolerance=1, y_tolerance=1)
 
-    pattern = re.compile(
-        r"Order Date:\s*(?P<order_date>.+?)\s*\n"
-        r"Shipping Method:\s*(?P<shipping_method>.+?)\s*\n"
-        r"Buyer Name:\s*(?P<buyer_name>.+?)\s*\n"
-        r"Seller Name:\s*(?P<seller_name>.+)",
-        re.DOTALL | re.IGNORECASE,
-    )
-    match = pattern.search(box_text)
+    match = SALE_INFORMATION_PATTERN.search(box_text)
     if match:
         return SaleInformation(**match.groupdict())
     else:
@@ -0,0 +1,207 @@
+import json
+import sys
+import time
+from enum import Enum
+from typing import Dict, Optional, TextIO
+
+from rich.progress import Progress
+from rich.text import Text
+
+# Rich only redraws 10 times a second, so updating it more often is wasted work
+RICH_PROGRESS_INTERVAL = 0.1
+DEFAULT_PROGRESS_INTERVAL = 1.0
+
+
+class ProgressFormat(str, Enum):
+    RICH = "rich"
+    JSONL = "jsonl"
+
+
+class StageProgress:
+    """Counters of a single processing stage, like parsing or rendering"""
+
+    def __init__(
+        self,
+        stage: str,
+        description: str,
+        unit: str,
+        total: Optional[int] = None,
+        completed: int = 0,
+    ):
+        self.stage = stage
+        self.description = description
+        self.unit = unit
+        self.total = total
+        self.completed = completed
+        # Resumed work does not count towards the rate
+        self.initial_completed = completed
+        self.orders: Optional[int] = None
+        self.queue_depth: Optional[int] = None
+        self.started_at = time.monotonic()
+        self.reported_at = self.started_at
+
+    def snapshot(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        rate = (self.completed - self.initial_completed) / elapsed if elapsed else 0.0
+        data = {
+            "stage": self.stage,
+            "unit": self.unit,
+            "completed": self.completed,
+            "total": self.total,
+            "elapsed_seconds": round(elapsed, 3),
+            f"{self.unit}_per_second": round(rate, 2),
+        }
+        if self.orders is not None:
+            data["orders"] = self.orders
+            data["orders_per_second"] = (
+                round(self.orders / elapsed, 2) if elapsed else 0.0
+            )
+        if self.queue_depth is not None:
+            data["queue_depth"] = self.queue_depth
+        if self.total is not None and rate:
+            data["eta_seconds"] = round(max(self.total - self.completed, 0) / rate, 1)
+        return data
+
+
+class ProgressReporter:
+    """
+    Receives the progress of each processing stage.
+
+    Stages call start_stage, advance and end_stage; the counters are kept here
+    and handed to on_start, on_progress and on_end. on_progress is called at
+    most once per min_interval, so advancing costs next to nothing per page.
+    The base class reports nothing, subclasses decide where progress goes.
+    """
+
+    def __init__(self, min_interval: float = DEFAULT_PROGRESS_INTERVAL):
+        self.min_interval = min_interval
+        self.stages: Dict[str, StageProgress] = {}
+
+    def start_stage(
+        self,
+        stage: str,
+        description: str,
+        unit: str,
+        total: Optional[int] = None,
+        completed: int = 0,
+    ):
+        self.stages[stage] = StageProgress(stage, description, unit, total, completed)
+        self.on_start(self.stages[stage])
+
+    def advance(
+        self,
+        stage: str,
+        amount: int = 1,
+        orders: Optional[int] = None,
+        queue_depth: Optional[int] = None,
+    ):
+        progress = self.stages[stage]
+        progress.completed += amount
+        if orders is not None:
+            progress.orders = orders
+        if queue_depth is not None:
+            progress.queue_depth = queue_depth
+
+        now = time.monotonic()
+        if now - progress.reported_at >= self.min_interval:
+            progress.reported_at = now
+            self.on_progress(progress)
+
+    def end_stage(self, stage: str, description: str, orders: Optional[int] = None):
+        progress = self.stages[stage]
+        if orders is not None:
+            progress.orders = orders
+        self.on_end(progress, description)
+
+    def log(self, message: str):
+        """Report a message; it may contain rich markup"""
+
+    def on_start(self, progress: StageProgress):
+        pass
+
+    def on_progress(self, progress: StageProgress):
+        pass
+
+    def on_end(self, progress: StageProgress, description: str):
+        pass
+
+
+class RichProgressReporter(ProgressReporter):
+    """Shows each stage as a bar of a rich Progress display"""
+
+    def __init__(self, progress: Progress, min_interval=RICH_PROGRESS_INTERVAL):
+        super().__init__(min_interval)
+        self.progress = progress
+        self.task_ids = {}
+
+    def log(self, message: str):
+        self.progress.console.print(message)
+
+    def on_start(self, progress: StageProgress):
+        task_id = self.task_ids.get(progress.stage)
+        if task_id is None:
+            self.task_ids[progress.stage] = self.progress.add_task(
+                f"[cyan]{progress.description}...",
+                total=progress.total,
+                completed=progress.completed,
+            )
+        else:
+            self.progress.reset(
+                task_id,
+                total=progress.total,
+                completed=progress.completed,
+                description=f"[cyan]{progress.description}...",
+            )
+
+    def on_progress(self, progress: StageProgress):
+        self.progress.update(
+            self.task_ids[progress.stage],
+            total=progress.total,
+            completed=progress.completed,
+        )
+
+    def on_end(self, progress: StageProgress, description: str):
+        self.progress.update(
+            self.task_ids[progress.stage],
+            total=progress.total if progress.total is not None else progress.completed,
+            completed=progress.completed,
+            description=f"[green]:white_heavy_check_mark: {description}!",
+        )
+
+
+class JsonlProgressReporter(ProgressReporter):
+    """
+    Writes progress as one JSON object per line for job runners to monitor.
+
+    Each line has an "event" (stage_start, progress, stage_end or log) and a
+    "timestamp". Progress events carry the stage counters, throughput, queue
+    depth and ETA. Progress events are written at most once per min_interval
+    while a stage advances, so a silence much longer than that means a stall.
+    """
+
+    def __init__(
+        self, stream: Optional[TextIO] = None, min_interval=DEFAULT_PROGRESS_INTERVAL
+    ):
+        super().__init__(min_interval)
+        self.stream = stream if stream is not None else sys.stdout
+
+    def emit(self, event: str, **data):
+        line = json.dumps({"event": event, "timestamp": round(time.time(), 3), **data})
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def log(self, message: str):
+        self.emit("log", message=Text.from_markup(message).plain)
+
+    def on_start(self, progress: StageProgress):
+        self.emit(
+            "stage_start",
+            description=progress.description,
+            **progress.snapshot(),
+        )
+
+    def on_progress(self, progress: StageProgress):
+        self.emit("progress", **progress.snapshot())
+
+    def on_end(self, progress: StageProgress, description: str):
+        self.emit("stage_end", description=description, **progress.snapshot())
@@ -0,0 +1,65 @@
+from enum import Enum
+from typing import List, Optional
+
+from slipdeck.checkpoint import Checkpoint
+from slipdeck.models.order import Marketplace, Order
+from slipdeck.pdf_creator import Logo, create_order_pdf
+from slipdeck.progress import ProgressReporter
+from slipdeck.render_cache import RenderCache
+from slipdeck.zpl_creator import create_order_zpl
+
+
+class RenderBackend(str, Enum):
+    PDF = "pdf"
+    ZPL = "zpl"
+
+
+def create_order_slips(
+    backend: RenderBackend,
+    orders: List[Order],
+    output_dir,
+    company_name,
+    marketplace: Marketplace,
+    progress: Optional[ProgressReporter] = None,
+    printer: Optional[str] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    render_cache: Optional[RenderCache] = None,
+    chunk_size: Optional[int] = None,
+    write_manifest=False,
+    logo: Optional[Logo] = None,
+    qr_code=False,
+):
+    """Render packing slips for the orders with the selected output backend"""
+    if backend == RenderBackend.ZPL:
+        if chunk_size or write_manifest or render_cache is not None:
+            raise ValueError(
+                "Chunked output and the render cache require the PDF backend."
+            )
+        return create_order_zpl(
+            orders,
+            output_dir,
+            company_name,
+            marketplace,
+            progress,
+            printer=printer,
+            logo=logo,
+            qr_code=qr_code,
+            checkpoint=checkpoint,
+        )
+
+    if printer:
+        raise ValueError("Sending directly to a printer requires the ZPL backend.")
+
+    return create_order_pdf(
+        orders,
+        output_dir,
+        company_name,
+        marketplace,
+        progress,
+        checkpoint=checkpoint,
+        render_cache=render_cache,
+        chunk_size=chunk_size,
+        write_manifest=write_manifest,
+        logo=logo,
+        qr_code=qr_code,
+    )
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from slipdeck.models.order import Marketplace, Order
+
+DEFAULT_RENDER_CACHE_DIR = (
+    Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "slipdeck" / "render"
+)
+DEFAULT_RENDER_CACHE_SIZE_MB = 512
+
+
+def render_cache_key(
+    order: Order,
+    company_name: str,
+    marketplace: Marketplace,
+    layout_version: int,
+    layout_options: Optional[dict] = None,
+) -> str:
+    """Hash everything that ends up on an order's rendered packing slip"""
+    key_data = {
+        "number": order.number,
+        # Where the order sat in the source PDF is never printed, and it shifts
+        # for every later order when one is added to or removed from a batch
+        "info": order.info.model_dump(mode="json", exclude={"page_info"}),
+        "company_name": company_name,
+        "marketplace": marketplace.value,
+        "layout_version": layout_version,
+        "layout_options": layout_options or {},
+    }
+    if order.combined_numbers:
+        key_data["combined_numbers"] = order.combined_numbers
+    return hashlib.sha256(
+        json.dumps(key_data, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+class RenderCache:
+    """
+    Content-addressed store of rendered packing slip PDFs.
+
+    Entries are files named by their render_cache_key. Each hit refreshes the
+    file's modification time, and trim() evicts the least recently used
+    entries once the cache grows beyond max_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir=DEFAULT_RENDER_CACHE_DIR,
+        max_bytes: int = DEFAULT_RENDER_CACHE_SIZE_MB * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def get_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pdf"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the cached PDF for the key, marking it as recently used"""
+        path = self.get_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def store(self, key: str, pdf_path) -> Path:
+        path = self.get_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        shutil.copyfile(pdf_path, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def trim(self):
+        """Evict least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total_size = 0
+        for path in self.cache_dir.glob("*.pdf"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        if total_size <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            path.unlink(missing_ok=True)
+            total_size -= size
+            if total_size <= self.max_bytes:
+                break
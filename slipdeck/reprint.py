@@ -0,0 +1,111 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PyPDF2 import PdfReader, PdfWriter
+
+INDEX_SUFFIX = ".index.json"
+
+
+def get_index_path(merged_pdf_path) -> Path:
+    merged_pdf_path = Path(merged_pdf_path)
+    return merged_pdf_path.with_name(merged_pdf_path.stem + INDEX_SUFFIX)
+
+
+def write_reprint_index(merged_pdf_path, page_ranges: Dict[str, Tuple[int, int]]):
+    """
+    Write the sidecar index mapping each order number to the first and last
+    page (1-based, inclusive) of its slip in the merged PDF.
+    """
+    index_path = get_index_path(merged_pdf_path)
+    index_path.write_text(
+        json.dumps(
+            {
+                "pdf": Path(merged_pdf_path).name,
+                "orders": {
+                    order_number: list(page_range)
+                    for order_number, page_range in page_ranges.items()
+                },
+            }
+        )
+    )
+    return index_path
+
+
+def load_reprint_index(index_path) -> dict:
+    return json.loads(Path(index_path).read_text())
+
+
+def find_indexes(search_dir) -> List[Path]:
+    """Return the batch indexes in a directory, newest first"""
+    return sorted(
+        Path(search_dir).glob(f"*{INDEX_SUFFIX}"),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+
+
+def get_batch_index_path(batch_path) -> Path:
+    batch_path = Path(batch_path)
+    if batch_path.name.endswith(INDEX_SUFFIX):
+        return batch_path
+    return get_index_path(batch_path)
+
+
+def extract_orders(
+    batches: List, order_numbers: List[str], output_dir
+) -> Tuple[Optional[Path], List[str]]:
+    """
+    Copy the pages of the given orders out of merged packing slip PDFs.
+
+    batches are merged PDFs or their indexes, searched in the given order, so
+    orders split across chunked parts are found too. Returns the path of the
+    reprint PDF (None if no order was found) and the order numbers that are
+    not in any batch.
+    """
+    remaining = list(dict.fromkeys(order_numbers))
+    pages_by_order = {}
+    for batch in batches:
+        if not remaining:
+            break
+        index_path = get_batch_index_path(batch)
+        index = load_reprint_index(index_path)
+        page_ranges = index["orders"]
+        found = [number for number in remaining if number in page_ranges]
+        if not found:
+            continue
+
+        reader = PdfReader(str(index_path.parent / index["pdf"]))
+        found_ranges = set()
+        for order_number in found:
+            start, end = page_ranges[order_number]
+            # Combined orders share a slip, which only needs printing once
+            pages_by_order[order_number] = (
+                []
+                if (start, end) in found_ranges
+                else [
+                    reader.pages[page_number - 1]
+                    for page_number in range(start, end + 1)
+                ]
+            )
+            found_ranges.add((start, end))
+        remaining = [number for number in remaining if number not in page_ranges]
+
+    if not pages_by_order:
+        return None, remaining
+
+    found_count = len(pages_by_order)
+    writer = PdfWriter()
+    for order_number in order_numbers:
+        for page in pages_by_order.pop(order_number, []):
+            writer.add_page(page)
+
+    reprint_path = (
+        Path(output_dir)
+        / f"Reprint_{found_count}_Orders_{datetime.now().strftime('%m%d%Y-%H%M%S')}.pdf"
+    )
+    with open(reprint_path, "wb") as f:
+        writer.write(f)
+
+    return reprint_path, remaining
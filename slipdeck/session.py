@@ -0,0 +1,141 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from functools import partial
+from io import BytesIO
+from typing import BinaryIO, List, Optional, Union
+
+from pydantic import BaseModel
+
+from slipdeck.checkpoint import Checkpoint, PageFailure
+from slipdeck.combine import combine_orders
+from slipdeck.inventory import InventoryIndex
+from slipdeck.models.order import Marketplace, Order
+from slipdeck.pdf_creator import (
+    group_pull_cards,
+    merge_pdf_bytes,
+    render_order_pdf_bytes,
+    render_pull_sheet_bytes,
+)
+from slipdeck.pdf_processor import parse_packing_slips
+
+
+class SessionResult(BaseModel):
+    orders: List[Order]
+    packing_slips: Optional[bytes] = None
+    pull_sheet: Optional[bytes] = None
+    failures: List[PageFailure] = []
+
+
+class Session:
+    """
+    In-memory slipdeck pipeline for embedding in long-running services.
+
+    Takes packing slip PDFs as bytes or binary file objects and returns the
+    packing slips and pull sheet as PDF bytes without touching the filesystem.
+    The parsing patterns and font metrics are loaded once per process, and
+    with max_workers > 1 the render worker pool stays up between calls until
+    the session is closed. An inventory index orders the pull sheet by shelf
+    location.
+    """
+
+    def __init__(
+        self,
+        company_name: str,
+        marketplace: Marketplace = Marketplace.TCGPLAYER,
+        max_workers: Optional[int] = None,
+        inventory: Optional[InventoryIndex] = None,
+    ):
+        self.company_name = company_name
+        self.marketplace = marketplace
+        self.max_workers = max_workers
+        self.inventory = inventory
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers is None or self.max_workers < 2:
+            return None
+        if self._executor is None:
+            # Forking a threaded host process can deadlock the workers on locks
+            # other threads held, so start them fresh instead
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def parse(
+        self, source: Union[bytes, BinaryIO], checkpoint: Optional[Checkpoint] = None
+    ) -> List[Order]:
+        if isinstance(source, (bytes, bytearray)):
+            source = BytesIO(source)
+        return parse_packing_slips(source, self.marketplace, checkpoint=checkpoint)
+
+    def render_packing_slips(self, orders: List[Order]) -> bytes:
+        render = partial(
+            render_order_pdf_bytes,
+            company_name=self.company_name,
+            marketplace=self.marketplace,
+        )
+        executor = self.executor
+        if executor is not None:
+            chunksize = max(1, len(orders) // (self.max_workers * 4))
+            rendered = executor.map(render, orders, chunksize=chunksize)
+        else:
+            rendered = map(render, orders)
+
+        return merge_pdf_bytes(
+            {order.number: pdf for order, pdf in zip(orders, rendered)}
+        )
+
+    def render_pull_sheet(self, orders: List[Order]) -> bytes:
+        return render_pull_sheet_bytes(*group_pull_cards(orders, self.inventory))
+
+    def process(
+        self,
+        source: Union[bytes, BinaryIO],
+        packing_slips: bool = True,
+        pull_sheet: bool = True,
+        combine: bool = False,
+    ) -> SessionResult:
+        """
+        Parse a packing slip PDF and render the requested outputs.
+
+        With combine, orders from the same buyer to the same address share a
+        packing slip; the pull sheet still lists every original order.
+        """
+        checkpoint = Checkpoint()
+        orders = self.parse(source, checkpoint)
+        slip_orders = combine_orders(orders) if combine else orders
+
+        # With a worker pool the pull sheet renders alongside the packing slips
+        pull_sheet_future = None
+        if pull_sheet and self.executor is not None:
+            pull_sheet_future = self.executor.submit(
+                render_pull_sheet_bytes, *group_pull_cards(orders, self.inventory)
+            )
+        packing_slips_pdf = (
+            self.render_packing_slips(slip_orders) if packing_slips else None
+        )
+        if pull_sheet_future is not None:
+            pull_sheet_pdf = pull_sheet_future.result()
+        else:
+            pull_sheet_pdf = self.render_pull_sheet(orders) if pull_sheet else None
+
+        return SessionResult(
+            orders=orders,
+            packing_slips=packing_slips_pdf,
+            pull_sheet=pull_sheet_pdf,
+            failures=checkpoint.state.failures,
+        )
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,408 @@
+import socket
+import textwrap
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from slipdeck.barcodes import CODE128_QUIET_ZONE
+from slipdeck.checkpoint import Checkpoint
+from slipdeck.models.order import Card, Marketplace, Order
+from slipdeck.pdf_creator import (
+    BARCODE_HEIGHT,
+    BOTTOM_MARGIN,
+    HORIZONTAL_MARGIN,
+    NEW_LINE_HEIGHT,
+    ORDER_NUM_HEADER_FONT_SIZE,
+    PAGE_HEIGHT,
+    PAGE_WIDTH,
+    QR_CODE_SIZE,
+    SHIP_TO_HEADER_FONT_SIZE,
+    STANDARD_FONT_SIZE,
+    TOP_MARGIN,
+    Logo,
+    get_card_total_text,
+    get_order_total_text,
+)
+from slipdeck.progress import ProgressReporter
+
+# Standard Zebra thermal printers print at 8 dots/mm
+DOTS_PER_INCH = 203
+DEFAULT_PRINTER_PORT = 9100
+PRINTER_TIMEOUT = 10
+LOGO_GRAPHIC_NAME = "R:SDLOGO.GRF"
+ZPL_BARCODE_MODULE_WIDTH = 2
+ZPL_QR_MAGNIFICATION = 4
+# Average glyph width of the scalable ^A0 font relative to its height
+ZPL_CHAR_WIDTH_RATIO = 0.5
+
+
+def inches_to_dots(inches: float) -> int:
+    return round(inches * DOTS_PER_INCH)
+
+
+def points_to_dots(points: float) -> int:
+    return round(points / 72 * DOTS_PER_INCH)
+
+
+def escape_field_data(text: str) -> str:
+    """Escape ZPL control characters so they can be used inside a ^FH field"""
+    return text.replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+
+
+class OrderZPL:
+    """
+    Renders a packing slip as native ZPL II commands using the same 4x6 layout
+    as OrderPDF. Each page of the slip becomes one ^XA...^XZ label.
+    """
+
+    def __init__(self):
+        self.headers = ["Qty", "Description", "Price", "Total Price"]
+        self.col_widths = [0.4, 2, 0.5, 0.7]
+        self.col_aligns = ["C", "L", "R", "R"]
+        self.current_order = None
+        self.pages: List[List[str]] = []
+        self.font_size = STANDARD_FONT_SIZE
+        self.y = 0
+        self.l_margin = inches_to_dots(HORIZONTAL_MARGIN)
+        self.epw = inches_to_dots(PAGE_WIDTH - 2 * HORIZONTAL_MARGIN)
+        self.page_break_trigger = inches_to_dots(PAGE_HEIGHT - BOTTOM_MARGIN)
+        self.line_height = inches_to_dots(NEW_LINE_HEIGHT)
+
+    def add_page(self, print_table_headers=True):
+        self.pages.append([])
+        self.y = inches_to_dots(TOP_MARGIN)
+        if print_table_headers:
+            self.print_table_headers()
+
+    def start_new_order(self, order_number):
+        self.current_order = order_number
+
+    def set_font(self, size: float):
+        self.font_size = size
+
+    def ln(self, height: Optional[float] = None):
+        self.y += inches_to_dots(height) if height is not None else self.line_height
+
+    def text(self, x: int, y: int, text: str, width: Optional[int] = None, align="L"):
+        """Place a single line of text, optionally justified inside a field block"""
+        font = points_to_dots(self.font_size)
+        command = f"^FO{x},{y}^A0N,{font},{font}"
+        if width is not None:
+            justification = {"L": "L", "C": "C", "R": "R"}[align]
+            command += f"^FB{width},1,0,{justification},0"
+        self.pages[-1].append(f"{command}^FH_^FD{escape_field_data(text)}^FS")
+
+    def box(self, x: int, y: int, width: int, height: int, thickness: int = 1):
+        self.pages[-1].append(f"^FO{x},{y}^GB{width},{height},{thickness}^FS")
+
+    def line_of_text(self, text: str):
+        self.text(self.l_margin, self.y, text)
+        self.y += max(points_to_dots(self.font_size), self.line_height)
+
+    def print_table_headers(self):
+        self.set_font(STANDARD_FONT_SIZE)
+        x = self.l_margin
+        for i, header in enumerate(self.headers):
+            width = inches_to_dots(self.col_widths[i])
+            self.box(x, self.y, width, self.line_height)
+            self.text(x + 2, self.y + 3, header, width - 4, self.col_aligns[i])
+            x += width
+        self.y += self.line_height
+
+    def draw_full_dashed_line(self, dash_length=0.03, space_length=0.05):
+        dash = inches_to_dots(dash_length)
+        step = dash + inches_to_dots(space_length)
+        for x in range(self.l_margin, self.l_margin + self.epw - dash + 1, step):
+            self.box(x, self.y, dash, 2, 2)
+
+    def get_description_lines(self, description: str) -> List[str]:
+        width = inches_to_dots(self.col_widths[1]) - 4
+        char_width = points_to_dots(self.font_size) * ZPL_CHAR_WIDTH_RATIO
+        return textwrap.wrap(description, max(1, int(width / char_width))) or [""]
+
+    def create_cards_table(self, cards: List[Card]):
+        for card in cards:
+            description_lines = self.get_description_lines(card.Description)
+            row_height = self.line_height * len(description_lines)
+
+            if self.y + row_height > self.page_break_trigger:
+                self.add_page()
+
+            values = [
+                card.Quantity,
+                None,
+                card.Price or "",
+                get_card_total_text(card),
+            ]
+
+            x = self.l_margin
+            for i, value in enumerate(values):
+                width = inches_to_dots(self.col_widths[i])
+                self.box(x, self.y, width, row_height)
+                if value is None:
+                    for line_number, line in enumerate(description_lines):
+                        self.text(
+                            x + 2, self.y + 3 + line_number * self.line_height, line
+                        )
+                else:
+                    self.text(x + 2, self.y + 3, value, width - 4, self.col_aligns[i])
+                x += width
+            self.y += row_height
+
+    def print_total_row(self, cards: List[Card], order_total: Optional[str] = None):
+        self.ln()
+        if self.y + self.line_height > self.page_break_trigger:
+            self.add_page(print_table_headers=False)
+
+        total_quantity = sum(int(card.Quantity) for card in cards)
+        total_text = get_order_total_text(cards, order_total)
+        total_row_width = inches_to_dots(PAGE_WIDTH - 0.4)
+        self.set_font(STANDARD_FONT_SIZE)
+        self.text(self.l_margin, self.y, f"Total Items: {total_quantity}")
+        if total_text is not None:
+            self.text(
+                self.l_margin + total_row_width * 2 // 3,
+                self.y,
+                f"Total: {total_text}",
+            )
+        self.y += self.line_height
+
+    def footer(self, page_no: int, total_pages: int) -> str:
+        font = points_to_dots(STANDARD_FONT_SIZE)
+        order_label = f"Order: {self.current_order}" if self.current_order else ""
+        text = escape_field_data(f"{order_label} - Page {page_no} of {total_pages}")
+        return (
+            f"^FO0,{inches_to_dots(PAGE_HEIGHT - 0.3)}^A0N,{font},{font}"
+            f"^FB{inches_to_dots(PAGE_WIDTH)},1,0,C,0^FH_^FD{text}^FS"
+        )
+
+    def output(self) -> bytes:
+        """Return every page of the slip as ZPL labels"""
+        labels = []
+        for page_no, commands in enumerate(self.pages, start=1):
+            labels.append(
+                "^XA^CI28"
+                f"^PW{inches_to_dots(PAGE_WIDTH)}^LL{inches_to_dots(PAGE_HEIGHT)}"
+                + "".join(commands)
+                + self.footer(page_no, len(self.pages))
+                + "^XZ\n"
+            )
+        return "".join(labels).encode("utf-8")
+
+
+def print_shipping_to_header_zpl(zpl: OrderZPL, shipping_address):
+    zpl.set_font(SHIP_TO_HEADER_FONT_SIZE)
+
+    zpl.line_of_text(shipping_address.name)
+    zpl.line_of_text(shipping_address.address_line1)
+    if shipping_address.address_line2:
+        zpl.line_of_text(shipping_address.address_line2)
+    zpl.line_of_text(shipping_address.city_state_zip)
+
+
+def download_logo_graphic(logo: Logo) -> bytes:
+    """
+    Convert the logo to a 1-bit ZPL graphic stored on the printer once per job,
+    so every label can recall it with ^XG instead of carrying its own copy.
+    """
+    from PIL import Image, ImageOps
+
+    image = logo.image
+    if image.mode == "LA":
+        background = Image.new("LA", image.size, (255, 255))
+        image = Image.alpha_composite(background, image)
+    image = image.convert("L").resize(
+        (inches_to_dots(logo.width), inches_to_dots(logo.height)), Image.LANCZOS
+    )
+    # ZPL graphics use 1 for black dots, the opposite of PIL's 1-bit images
+    bitmap = ImageOps.invert(image).convert("1")
+    bytes_per_row = (bitmap.width + 7) // 8
+    data = bitmap.tobytes()
+    return (
+        f"~DG{LOGO_GRAPHIC_NAME},{len(data)},{bytes_per_row},{data.hex().upper()}\n"
+    ).encode("ascii")
+
+
+def print_order_barcodes_zpl(zpl: OrderZPL, order_number: str, qr_code=False):
+    """Use the printer's own Code 128 and QR code symbologies for the order number"""
+    height = inches_to_dots(BARCODE_HEIGHT)
+    data = escape_field_data(order_number)
+    quiet_zone = CODE128_QUIET_ZONE * ZPL_BARCODE_MODULE_WIDTH
+    zpl.pages[-1].append(
+        f"^FO{zpl.l_margin + quiet_zone},{zpl.y}^BY{ZPL_BARCODE_MODULE_WIDTH}"
+        f"^BCN,{height},N,N,N,A^FH_^FD{data}^FS"
+    )
+    if qr_code:
+        qr_x = zpl.l_margin + zpl.epw - inches_to_dots(QR_CODE_SIZE)
+        zpl.pages[-1].append(
+            f"^FO{qr_x},{zpl.y}^BQN,2,{ZPL_QR_MAGNIFICATION}^FH_^FDMA,{data}^FS"
+        )
+        height = inches_to_dots(QR_CODE_SIZE)
+    zpl.y += height
+
+
+def render_order_zpl(
+    order: Order,
+    company_name,
+    marketplace: Marketplace,
+    logo: Optional[Logo] = None,
+    qr_code=False,
+) -> bytes:
+    zpl = OrderZPL()
+    zpl.add_page(print_table_headers=False)
+    zpl.start_new_order(order.number)
+
+    if logo is not None:
+        x = (inches_to_dots(PAGE_WIDTH) - inches_to_dots(logo.width)) // 2
+        zpl.pages[-1].append(f"^FO{x},{zpl.y}^XG{LOGO_GRAPHIC_NAME},1,1^FS")
+        zpl.y += inches_to_dots(logo.height) + zpl.line_height
+
+    print_shipping_to_header_zpl(zpl, order.info.shipping_address)
+
+    zpl.ln(NEW_LINE_HEIGHT)
+
+    zpl.draw_full_dashed_line()
+
+    zpl.ln(NEW_LINE_HEIGHT)
+
+    # Print order number
+    zpl.set_font(ORDER_NUM_HEADER_FONT_SIZE)
+    if order.combined_numbers:
+        zpl.line_of_text(f"Orders ({len(order.combined_numbers)}):")
+        for order_number in order.combined_numbers:
+            zpl.line_of_text(order_number)
+    else:
+        zpl.line_of_text(f"Order: {order.number}")
+
+    zpl.ln(NEW_LINE_HEIGHT / 2)
+
+    print_order_barcodes_zpl(zpl, order.number, qr_code)
+
+    zpl.ln(NEW_LINE_HEIGHT / 2)
+
+    zpl.set_font(STANDARD_FONT_SIZE)
+    zpl.line_of_text(
+        f"Thank you for buying from {company_name} on {marketplace.value}."
+    )
+    zpl.ln(NEW_LINE_HEIGHT / 3)
+
+    cards = order.info.cards
+
+    zpl.print_table_headers()
+
+    zpl.create_cards_table(cards)
+    zpl.print_total_row(cards, order.info.order_total)
+
+    return zpl.output()
+
+
+def parse_printer_address(printer: str) -> Tuple[str, int]:
+    """
+    Split a HOST[:PORT] string into a (host, port) tuple. An IPv6 address
+    needs brackets to carry a port, like [::1]:9100.
+    """
+    printer = printer.strip()
+    if printer.startswith("["):
+        host, bracket, rest = printer[1:].partition("]")
+        if not bracket or (rest and not rest.startswith(":")):
+            raise ValueError(f"Invalid printer address {printer!r}")
+        port = rest[1:] if rest else None
+    elif printer.count(":") == 1:
+        host, _, port = printer.partition(":")
+    else:
+        # A host name, IPv4 address or bare IPv6 address without a port
+        host, port = printer, None
+
+    if not host:
+        raise ValueError(f"Printer address {printer!r} has no host")
+    if port is None:
+        return host, DEFAULT_PRINTER_PORT
+    if not port.isdecimal() or not 0 < int(port) < 65536:
+        raise ValueError(f"Invalid port in printer address {printer!r}")
+    return host, int(port)
+
+
+def connect_to_printer(printer: str) -> socket.socket:
+    """
+    Open a connection to the printer's raw port. Raises ValueError for an
+    invalid address and ConnectionError when the printer can't be reached.
+    """
+    address = parse_printer_address(printer)
+    try:
+        return socket.create_connection(address, timeout=PRINTER_TIMEOUT)
+    except OSError as e:
+        raise ConnectionError(f"Could not connect to printer {printer}: {e}") from e
+
+
+def create_order_zpl(
+    orders: List[Order],
+    output_dir,
+    company_name,
+    marketplace: Marketplace,
+    progress: Optional[ProgressReporter] = None,
+    printer: Optional[str] = None,
+    logo: Optional[Logo] = None,
+    qr_code=False,
+    checkpoint: Optional[Checkpoint] = None,
+):
+    """
+    Write the packing slips for every order as a single ZPL print job.
+
+    When a printer address is given the labels are also streamed to its raw
+    port (9100) as each order is rendered, so printing starts immediately.
+    A logo is downloaded to the printer once at the start of the job.
+    Orders that fail to render are quarantined in the checkpoint and left
+    out of the job.
+    """
+    if progress is not None:
+        progress.start_stage("render", "Creating ZPL labels", "orders", len(orders))
+
+    zpl_path = (
+        Path(output_dir)
+        / f"{marketplace.value}_PackingSlips_{len(orders)}_Orders_{datetime.now().strftime('%m%d%Y-%H%M')}.zpl"
+    )
+
+    printer_socket = connect_to_printer(printer) if printer else None
+
+    try:
+        with open(zpl_path, "wb") as f:
+
+            def send(data: bytes):
+                f.write(data)
+                if printer_socket is not None:
+                    try:
+                        printer_socket.sendall(data)
+                    except OSError as e:
+                        raise ConnectionError(
+                            f"Lost connection to printer {printer}: {e}"
+                        ) from e
+
+            if logo is not None:
+                send(download_logo_graphic(logo))
+
+            for order in orders:
+                try:
+                    labels = render_order_zpl(
+                        order, company_name, marketplace, logo, qr_code
+                    )
+                except (ValueError, IndexError, KeyError) as e:
+                    if checkpoint is None:
+                        raise
+                    for order_number in order.order_numbers:
+                        checkpoint.quarantine("render", repr(e), order_number)
+                else:
+                    send(labels)
+
+                if progress is not None:
+                    progress.advance("render")
+
+            if logo is not None:
+                send(f"^XA^ID{LOGO_GRAPHIC_NAME}^FS^XZ\n".encode("ascii"))
+    finally:
+        if printer_socket is not None:
+            printer_socket.close()
+
+    if progress is not None:
+        progress.end_stage("render", f"Wrote ZPL packing slips to {zpl_path}")
+
+    return zpl_path
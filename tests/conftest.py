@@ -0,0 +1,74 @@
+"""Shared fixtures for the Slipdeck tests."""
+
+import pytest
+
+from slipdeck.models.order import (
+    Card,
+    Marketplace,
+    Order,
+    OrderInfo,
+    PageInfo,
+    SaleInformation,
+    ShippingAddress,
+)
+
+
+def make_card(name="Lightning Bolt", number="150", product_line="Magic", **kwargs):
+    fields = {
+        "product_line": product_line,
+        "set": "Magic 2010",
+        "name": name,
+        "number": number,
+        "rarity": "C",
+        "condition": "Near Mint",
+    }
+    fields.update(kwargs)
+    description = " - ".join(
+        fields[key]
+        for key in ("product_line", "set", "name", "number", "rarity", "condition")
+    )
+    return Card(
+        Quantity="1",
+        Description=description,
+        Price="$1.25",
+        Total_Price="$1.25",
+        **fields,
+    )
+
+
+def make_order(number="1234ABCD-5678EF-01234", cards=None, name="Jane Doe"):
+    return Order(
+        number=number,
+        info=OrderInfo(
+            page_info=[PageInfo(page=1, total_pages=1, pdf_page=1)],
+            shipping_address=ShippingAddress(
+                name=name,
+                address_line1="123 Main St",
+                address_line2="",
+                city_state_zip="Springfield, IL 62701",
+                city="Springfield",
+                state="IL",
+                zip_code="62701",
+            ),
+            cards=cards if cards is not None else [make_card()],
+            sale_information=SaleInformation(
+                order_date="Monday, 01 January 2024",
+                shipping_method="Standard (7-10 days)",
+                buyer_name=name,
+                seller_name="Test Shop",
+            ),
+            marketplace=Marketplace.TCGPLAYER,
+        ),
+    )
+
+
+@pytest.fixture
+def orders():
+    return [
+        make_order("1234ABCD-5678EF-01234"),
+        make_order(
+            "9876ABCD-5678EF-04321",
+            cards=[make_card(name=f"Card {i}", number=str(i)) for i in range(1, 60)],
+            name="John Smith",
+        ),
+    ]
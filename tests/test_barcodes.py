@@ -0,0 +1,103 @@
+"""Tests for the vector order number barcodes."""
+
+import pytest
+from fpdf import FPDF
+
+from slipdeck.barcodes import (
+    CODE128_WIDTHS,
+    code128_bars,
+    draw_code128,
+    code128_rects,
+    encode_code128,
+    qr_code_rects,
+)
+
+
+def decode_code128(data):
+    """Read the barcode back from its bars, checking the checksum on the way"""
+    bars, modules = code128_bars(data)
+    widths = []
+    position = 0
+    for offset, width in bars:
+        if offset > position:
+            widths.append(offset - position)
+        widths.append(width)
+        position = offset + width
+    symbols = {widths: value for value, widths in enumerate(CODE128_WIDTHS)}
+    values = [symbols[tuple(widths[i : i + 6])] for i in range(0, len(widths) - 7, 6)]
+    assert symbols[tuple(widths[-7:])] == 106
+    assert position == modules
+
+    start, *values, checksum = values
+    assert (start + sum(i * v for i, v in enumerate(values, 1))) % 103 == checksum
+    text, code_set = "", "C" if start == 105 else "B"
+    for value in values:
+        if value in (99, 100):
+            code_set = "C" if value == 99 else "B"
+        elif code_set == "C":
+            text += f"{value:02}"
+        else:
+            text += chr(value + 32)
+    return text
+
+
+def test_encode_code128_matches_reference_checksum():
+    assert encode_code128("PJJ123C") == [104, 48, 42, 42, 17, 18, 19, 35, 55, 106]
+
+
+@pytest.mark.parametrize(
+    "order_number",
+    ["36666676-C978EF-DD5B3", "1234ABCD-5678EF-01234", "A1", "123456", ""],
+)
+def test_code128_round_trips(order_number):
+    assert decode_code128(order_number) == order_number
+
+
+def test_code128_packs_digit_runs_in_code_set_c():
+    # Start C, two digit pairs, switch to B for "-A", checksum and stop
+    assert encode_code128("1234-A")[:4] == [105, 12, 34, 100]
+    assert len(encode_code128("12345678")) < len(encode_code128("1234-5678"))
+
+
+def test_code128_rejects_characters_outside_code_set_b():
+    with pytest.raises(ValueError):
+        encode_code128("Ordér")
+
+
+def test_code128_rects_have_one_rectangle_per_bar():
+    bars, _ = code128_bars("36666676-C978EF-DD5B3")
+    assert code128_rects("36666676-C978EF-DD5B3") == tuple(
+        (offset, 0, width, 1) for offset, width in bars
+    )
+
+
+def test_qr_code_rects_cover_dark_modules():
+    segno = pytest.importorskip("segno")
+    matrix = segno.make_qr("36666676-C978EF-DD5B3", error="m").matrix
+    rects, modules = qr_code_rects("36666676-C978EF-DD5B3")
+
+    dark = set()
+    for column, row, length, _ in rects:
+        dark.update((row, column + i) for i in range(length))
+
+    assert modules == len(matrix)
+    assert dark == {
+        (row, column)
+        for row, line in enumerate(matrix)
+        for column, module in enumerate(line)
+        if module
+    }
+
+
+def test_barcode_bars_are_black_whatever_the_fill_color():
+    pdf = FPDF(unit="in", format=(4, 6))
+    pdf.set_compression(False)
+    pdf.add_page()
+    pdf.set_fill_color(128)
+
+    draw_code128(pdf, "36666676-C978EF-DD5B3", 0.2, 1, 0.35, 0.01)
+
+    content = bytes(pdf.output()).decode("latin-1")
+    barcode = content.split("\nq\n", 1)[1].split("\nQ", 1)[0]
+    assert barcode.startswith("0 g\n")
+    assert barcode.count(" re f") == len(code128_bars("36666676-C978EF-DD5B3")[0])
@@ -0,0 +1,86 @@
+"""Tests for checkpointing and failure quarantine."""
+
+from slipdeck.checkpoint import Checkpoint
+from slipdeck.models.order import Marketplace
+from slipdeck.pdf_creator import create_order_pdf, get_slip_cache_key
+
+
+def test_checkpoint_resumes_matching_source(orders, tmp_path):
+    source = tmp_path / "slips.pdf"
+    source.write_bytes(b"%PDF-1.4")
+    checkpoint_dir = tmp_path / "checkpoint"
+
+    checkpoint = Checkpoint(str(checkpoint_dir), interval=2)
+    assert not checkpoint.load(str(source))
+    checkpoint.state.orders.extend(orders)
+    checkpoint.page_done(0)
+    assert not checkpoint.state_path.exists()
+    checkpoint.page_done(1)
+    assert checkpoint.state_path.exists()
+
+    resumed = Checkpoint(str(checkpoint_dir))
+    assert resumed.load(str(source))
+    assert resumed.state.next_page == 2
+    assert [order.number for order in resumed.state.orders] == [
+        order.number for order in orders
+    ]
+
+
+def test_checkpoint_discards_other_source(tmp_path):
+    first = tmp_path / "first.pdf"
+    first.write_bytes(b"first")
+    second = tmp_path / "second.pdf"
+    second.write_bytes(b"second input")
+    checkpoint_dir = tmp_path / "checkpoint"
+
+    checkpoint = Checkpoint(str(checkpoint_dir), interval=1)
+    checkpoint.load(str(first))
+    checkpoint.page_done(0)
+
+    other = Checkpoint(str(checkpoint_dir))
+    assert not other.load(str(second))
+    assert other.state.next_page == 0
+
+
+def test_checkpoint_discards_other_options(tmp_path):
+    source = tmp_path / "slips.pdf"
+    source.write_bytes(b"%PDF-1.4")
+    checkpoint_dir = tmp_path / "checkpoint"
+
+    checkpoint = Checkpoint(str(checkpoint_dir), interval=1)
+    checkpoint.load(str(source), {"selected_orders": ["BBBB-2222"]})
+    checkpoint.page_done(1)
+
+    unfiltered = Checkpoint(str(checkpoint_dir))
+    assert not unfiltered.load(str(source), {"selected_orders": None})
+    assert unfiltered.state.next_page == 0
+
+
+def test_kept_slips_are_not_reused_for_other_layouts(orders, tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint"))
+    checkpoint.load(__file__)
+    create_order_pdf(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER, checkpoint=checkpoint
+    )
+    create_order_pdf(
+        orders, tmp_path, "Other Shop", Marketplace.TCGPLAYER, checkpoint=checkpoint
+    )
+
+    assert len(list(checkpoint.render_dir.glob("*.pdf"))) == 2 * len(orders)
+
+
+def test_create_order_pdf_quarantines_failed_orders(orders, tmp_path):
+    orders[0].info.cards[0].Price = "not a price"
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint"))
+    checkpoint.load(__file__)
+
+    merged_pdf_path = create_order_pdf(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER, checkpoint=checkpoint
+    )
+
+    assert merged_pdf_path.exists()
+    assert checkpoint.state.quarantined_orders == [orders[0].number]
+    assert checkpoint.state.failures[0].stage == "render"
+    slip_name = get_slip_cache_key(orders[1], "Test Shop", Marketplace.TCGPLAYER)
+    assert (checkpoint.render_dir / f"{slip_name}.pdf").exists()
+    assert checkpoint.write_quarantine_report(tmp_path).exists()
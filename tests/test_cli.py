@@ -14,6 +14,48 @@ def test_app():
     assert "Usage" in result.stdout
 
 
+def test_pack_rejects_pdf_only_options_with_zpl(tmp_path):
+    result = runner.invoke(
+        app,
+        [
+            "pack",
+            str(tmp_path / "slips.pdf"),
+            "--format",
+            "zpl",
+            "--chunk-size",
+            "10",
+            "--manifest",
+        ],
+    )
+    assert result.exit_code == 1
+    assert "--chunk-size, --manifest can only be used with --format pdf" in (
+        result.stdout
+    )
+
+
+def test_pack_rejects_pull_sheet_csv_with_pdf_input(tmp_path):
+    slips = tmp_path / "slips.pdf"
+    slips.write_bytes(b"%PDF-1.4")
+    pull_sheet = tmp_path / "pull.csv"
+    pull_sheet.write_text("Product Line,Product Name,Set,Order Quantity\n")
+
+    result = runner.invoke(
+        app,
+        [
+            "pack",
+            str(slips),
+            "--pull-sheet-csv",
+            str(pull_sheet),
+            "-o",
+            str(tmp_path / "output"),
+            "--progress-format",
+            "jsonl",
+        ],
+    )
+    assert result.exit_code == 1
+    assert "--pull-sheet-csv can only be used with an order list CSV" in (result.stdout)
+
+
 def test_main_command():
     """Test the main command."""
     result = runner.invoke(app, ["World"])
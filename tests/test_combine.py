@@ -0,0 +1,70 @@
+"""Tests for combining orders shipping to the same buyer and address."""
+
+from PyPDF2 import PdfReader
+
+from slipdeck.combine import combine_key, combine_orders
+from slipdeck.models.order import Marketplace
+from slipdeck.pdf_creator import create_order_pdf
+from slipdeck.reprint import extract_orders, get_index_path, load_reprint_index
+from tests.conftest import make_card, make_order
+
+
+def test_combine_key_normalizes_address_spelling():
+    order = make_order("AAAA-1111")
+    other = make_order("BBBB-2222")
+    order.info.shipping_address.address_line1 = "123 Main Street"
+    order.info.shipping_address.address_line2 = "Apt. 4"
+    other.info.shipping_address.address_line1 = "123 MAIN ST #4"
+    other.info.shipping_address.zip_code = "62701-1234"
+    assert combine_key(order) == combine_key(other)
+
+    other.info.shipping_address.address_line1 = "123 Main St #5"
+    assert combine_key(order) != combine_key(other)
+
+
+def test_combine_orders_merges_cards_and_numbers():
+    orders = [
+        make_order("AAAA-1111"),
+        make_order("CCCC-3333", name="John Smith"),
+        make_order("BBBB-2222", cards=[make_card(), make_card(name="Counterspell")]),
+    ]
+
+    combined, unchanged = combine_orders(orders)
+
+    assert unchanged is orders[1]
+    assert combined.number == "AAAA-1111"
+    assert combined.order_numbers == ["AAAA-1111", "BBBB-2222"]
+    assert [
+        (card.name, card.Quantity, card.Total_Price) for card in combined.info.cards
+    ] == [
+        ("Lightning Bolt", "2", "$2.50"),
+        ("Counterspell", "1", "$1.25"),
+    ]
+    assert len(combined.info.page_info) == 2
+    # The original orders are left alone for the pull sheet and the ledger
+    assert len(orders[0].info.cards) == 1
+    assert orders[0].info.cards[0].Quantity == "1"
+
+
+def test_combined_slip_is_indexed_under_every_order_number(tmp_path):
+    combined_orders = combine_orders(
+        [
+            make_order("AAAA-1111"),
+            make_order("BBBB-2222"),
+            make_order("CCCC-3333", name="John Smith"),
+        ]
+    )
+    merged_pdf_path = create_order_pdf(
+        combined_orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER
+    )
+
+    assert len(PdfReader(str(merged_pdf_path)).pages) == 2
+    page_ranges = load_reprint_index(get_index_path(merged_pdf_path))["orders"]
+    assert page_ranges["AAAA-1111"] == page_ranges["BBBB-2222"] == [1, 1]
+    assert page_ranges["CCCC-3333"] == [2, 2]
+
+    reprint_path, missing = extract_orders(
+        [merged_pdf_path], ["AAAA-1111", "BBBB-2222"], tmp_path
+    )
+    assert missing == []
+    assert len(PdfReader(str(reprint_path)).pages) == 1
@@ -0,0 +1,175 @@
+"""Tests for ingesting TCGplayer CSV exports."""
+
+import csv
+import io
+
+import pdfplumber
+from fpdf import FPDF
+
+from slipdeck.csv_ingest import InputType, detect_input_type, ingest_tcgplayer_csv
+from slipdeck.models.order import Marketplace
+from slipdeck.pdf_creator import render_order_pdf_bytes
+
+ORDER_LIST_HEADER = [
+    "Order #",
+    "FirstName",
+    "LastName",
+    "Address1",
+    "Address2",
+    "City",
+    "State",
+    "PostalCode",
+    "Country",
+    "Order Date",
+    "Shipping Method",
+    "Value Of Products",
+]
+PULL_SHEET_HEADER = [
+    "Product Line",
+    "Product Name",
+    "Condition",
+    "Number",
+    "Set",
+    "Rarity",
+    "Quantity",
+    "Order Quantity",
+]
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def write_exports(tmp_path):
+    order_list = write_csv(
+        tmp_path / "orders.csv",
+        ORDER_LIST_HEADER,
+        [
+            [
+                "AAAA-1111",
+                "Jane",
+                "Doe",
+                "1 Main St",
+                "",
+                "Springfield",
+                "IL",
+                "62701",
+                "US",
+                "1/1/2024",
+                "Standard",
+                "$1.50",
+            ],
+            [
+                "BBBB-2222",
+                "John",
+                "Smith",
+                "2 Oak Ave",
+                "Apt 3",
+                "Portland",
+                "OR",
+                "97201",
+                "US",
+                "1/1/2024",
+                "Expedited",
+                "$7.25",
+            ],
+        ],
+    )
+    pull_sheet = write_csv(
+        tmp_path / "pull.csv",
+        PULL_SHEET_HEADER,
+        [
+            [
+                "Magic",
+                "Lightning Bolt",
+                "Near Mint",
+                "150",
+                "Magic 2010",
+                "C",
+                "3",
+                "AAAA-1111:1, BBBB-2222:2",
+            ],
+            [
+                "Pokemon",
+                "Pikachu",
+                "Near Mint",
+                "25",
+                "Base Set",
+                "C",
+                "1",
+                "BBBB-2222:1",
+            ],
+        ],
+    )
+    return order_list, pull_sheet
+
+
+def test_detect_input_type(tmp_path):
+    order_list, pull_sheet = write_exports(tmp_path)
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.output(str(tmp_path / "slips.pdf"))
+
+    assert detect_input_type(order_list) == InputType.ORDER_LIST_CSV
+    assert detect_input_type(pull_sheet) == InputType.PULL_SHEET_CSV
+    assert detect_input_type(str(tmp_path / "slips.pdf")) == InputType.PDF
+
+    # The address columns are read for every order, so they must be there
+    without_zip = write_csv(
+        tmp_path / "no_zip.csv",
+        [column for column in ORDER_LIST_HEADER if column != "PostalCode"],
+        [],
+    )
+    assert detect_input_type(without_zip) == InputType.UNKNOWN
+
+    image = tmp_path / "logo.png"
+    image.write_bytes(b"\x89PNG\r\n\x1a\n\xff\xfe\x00binary")
+    assert detect_input_type(str(image)) == InputType.UNKNOWN
+
+
+def test_ingest_tcgplayer_csv(tmp_path):
+    orders = ingest_tcgplayer_csv(*write_exports(tmp_path), seller_name="Test Shop")
+
+    assert [order.number for order in orders] == ["AAAA-1111", "BBBB-2222"]
+    jane, john = orders
+    assert jane.info.shipping_address.city_state_zip == "Springfield, IL 62701"
+    assert jane.info.sale_information.seller_name == "Test Shop"
+    assert [(card.name, card.Quantity) for card in john.info.cards] == [
+        ("Lightning Bolt", "2"),
+        ("Pikachu", "1"),
+    ]
+    assert john.info.shipping_address.address_line2 == "Apt 3"
+    assert john.info.cards[0].Description == (
+        "Magic - Magic 2010 - Lightning Bolt - 150 - C - Near Mint"
+    )
+
+
+def test_ingest_tcgplayer_csv_filters(tmp_path):
+    exports = write_exports(tmp_path)
+
+    assert [
+        order.number
+        for order in ingest_tcgplayer_csv(*exports, shipping_method="expedited")
+    ] == ["BBBB-2222"]
+    assert [
+        order.number
+        for order in ingest_tcgplayer_csv(*exports, skip_orders={"BBBB-2222"})
+    ] == ["AAAA-1111"]
+
+
+def test_csv_slips_never_print_made_up_prices(tmp_path):
+    orders = ingest_tcgplayer_csv(*write_exports(tmp_path), seller_name="Test Shop")
+    john = orders[1]
+
+    assert [card.Price for card in john.info.cards] == [None, None]
+    assert john.info.order_total == "$7.25"
+
+    slip = render_order_pdf_bytes(john, "Test Shop", Marketplace.TCGPLAYER)
+    with pdfplumber.open(io.BytesIO(slip)) as pdf:
+        text = "\n".join(page.extract_text() for page in pdf.pages)
+    assert "Total: $7.25" in text
+    assert "$0.00" not in text
@@ -0,0 +1,107 @@
+"""Tests for ordering the pull sheet by inventory location."""
+
+import csv
+import io
+
+import pdfplumber
+import pytest
+
+from slipdeck.inventory import InventoryIndex, natural_sort_key
+from slipdeck.pdf_creator import (
+    group_pull_cards,
+    pull_card_sort_key,
+    render_pull_sheet_bytes,
+)
+from tests.conftest import make_card, make_order
+
+
+def write_inventory(path, header, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_natural_sort_key_orders_numbers_by_value():
+    numbers = ["10", "2", "1a", "001", "B2", "B10"]
+    assert sorted(numbers, key=natural_sort_key) == [
+        "001",
+        "1a",
+        "2",
+        "10",
+        "B2",
+        "B10",
+    ]
+
+
+def test_inventory_lookup_normalizes_set_and_number(tmp_path):
+    inventory = InventoryIndex.load(
+        write_inventory(
+            tmp_path / "inventory.csv",
+            ["Set Name", "Number", "Bin", "Slot"],
+            [
+                ["Base Set", "006/102", "B2", "10"],
+                ["Magic 2010", "150", "A1", "3"],
+                ["Magic 2010", "150", "Z9", "1"],
+            ],
+        )
+    )
+
+    assert len(inventory) == 2
+    assert inventory.lookup("base set", "6").location == "B2-10"
+    assert inventory.lookup("Magic 2010", "150").location == "A1-3"
+    assert inventory.lookup("Magic 2010", "151") is None
+
+
+def test_inventory_requires_location_columns(tmp_path):
+    path = write_inventory(tmp_path / "inventory.csv", ["Set", "Number"], [])
+    with pytest.raises(ValueError):
+        InventoryIndex.load(path)
+
+
+def test_pull_sheet_is_sorted_by_location(tmp_path):
+    inventory = InventoryIndex.load(
+        write_inventory(
+            tmp_path / "inventory.csv",
+            ["Set", "Number", "Location"],
+            [
+                ["Magic 2010", "2", "Shelf 10"],
+                ["Magic 2010", "10", "Shelf 2"],
+            ],
+        )
+    )
+    orders = [
+        make_order(
+            cards=[
+                make_card(name="Unshelved", number="1"),
+                make_card(name="Two", number="2"),
+                make_card(name="Ten", number="10"),
+            ]
+        )
+    ]
+
+    magic_cards, _, _ = group_pull_cards(orders, inventory)
+    assert [card.name for card in sorted(magic_cards, key=pull_card_sort_key)] == [
+        "Magic 2010 Ten 10",
+        "Magic 2010 Two 2",
+        "Magic 2010 Unshelved 1",
+    ]
+
+    pull_sheet = render_pull_sheet_bytes(magic_cards, [], [])
+    with pdfplumber.open(io.BytesIO(pull_sheet)) as pdf:
+        text = pdf.pages[0].extract_text()
+    assert "Location" in text
+    assert text.index("Shelf 2") < text.index("Shelf 10")
+
+
+def test_pull_sheet_sorts_card_numbers_naturally():
+    orders = [
+        make_order(cards=[make_card(name="Same", number=n) for n in ("10", "2", "1")])
+    ]
+    magic_cards, _, _ = group_pull_cards(orders)
+    assert [card.number for card in sorted(magic_cards, key=pull_card_sort_key)] == [
+        "1",
+        "2",
+        "10",
+    ]
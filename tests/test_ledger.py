@@ -0,0 +1,29 @@
+"""Tests for the processed-order ledger."""
+
+from slipdeck.ledger import OrderLedger, order_content_hash
+
+
+def test_ledger_records_orders(orders, tmp_path):
+    db_path = str(tmp_path / "ledger.db")
+    with OrderLedger(db_path) as ledger:
+        assert orders[0].number not in ledger
+        ledger.record(orders[:1])
+
+    with OrderLedger(db_path) as ledger:
+        assert orders[0].number in ledger
+        assert orders[1].number not in ledger
+        assert len(ledger) == 1
+        assert ledger.get_content_hash(orders[0].number) == order_content_hash(
+            orders[0]
+        )
+
+
+def test_ledger_record_replaces_existing_entry(orders, tmp_path):
+    with OrderLedger(str(tmp_path / "ledger.db")) as ledger:
+        ledger.record(orders[:1])
+        orders[0].info.cards[0].Quantity = "2"
+        ledger.record(orders[:1])
+        assert len(ledger) == 1
+        assert ledger.get_content_hash(orders[0].number) == order_content_hash(
+            orders[0]
+        )
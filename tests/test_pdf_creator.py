@@ -0,0 +1,115 @@
+"""Tests for the PDF packing slip renderer."""
+
+import io
+
+import pytest
+from PIL import Image
+from PyPDF2 import PdfReader
+
+from slipdeck.barcodes import CODE128_QUIET_ZONE, code128_bars
+from slipdeck.models.order import Marketplace
+from slipdeck.pdf_creator import (
+    BARCODE_MODULE_WIDTH,
+    HORIZONTAL_MARGIN,
+    LOGO_HEIGHT,
+    create_order_pdf,
+    group_pull_cards,
+    load_logo,
+    render_pull_sheet_bytes,
+)
+from tests.conftest import make_card, make_order
+
+
+@pytest.fixture
+def logo_path(tmp_path):
+    path = tmp_path / "logo.png"
+    Image.effect_noise((1200, 400), 64).convert("RGBA").save(path)
+    return path
+
+
+def test_load_logo_scales_to_slip_header(logo_path):
+    logo = load_logo(str(logo_path))
+    assert logo.height == pytest.approx(LOGO_HEIGHT)
+    assert logo.width == pytest.approx(1.5)
+    assert logo.image.mode == "LA"
+    assert logo.image.size == (450, 150)
+
+
+def test_logo_is_embedded_once_in_merged_slips(logo_path, tmp_path):
+    logo = load_logo(str(logo_path))
+    orders = [make_order(f"1234ABCD-5678EF-{i:05}") for i in range(5)]
+    merged_pdf_path = create_order_pdf(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER, logo=logo
+    )
+
+    image_ids = set()
+    reader = PdfReader(str(merged_pdf_path))
+    for page in reader.pages:
+        x_objects = page["/Resources"].get("/XObject", {})
+        image_ids.update(ref.idnum for ref in x_objects.values())
+
+    assert len(reader.pages) == len(orders)
+    assert len(image_ids) == 1
+
+
+def test_transparent_logo_is_embedded_once(tmp_path):
+    image = Image.new("RGBA", (600, 200), (0, 0, 0, 0))
+    image.paste((20, 20, 20, 255), (100, 50, 500, 150))
+    image.save(tmp_path / "logo.png")
+    logo = load_logo(str(tmp_path / "logo.png"))
+    orders = [make_order(f"1234ABCD-5678EF-{i:05}") for i in range(5)]
+
+    merged_pdf_path = create_order_pdf(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER, logo=logo
+    )
+
+    reader = PdfReader(str(merged_pdf_path))
+    image_ids, mask_ids = set(), set()
+    for page in reader.pages:
+        for reference in page["/Resources"]["/XObject"].values():
+            image_ids.add(reference.idnum)
+            mask_ids.add(reference.get_object().raw_get("/SMask").idnum)
+    assert len(image_ids) == len(mask_ids) == 1
+
+
+def test_order_slips_carry_order_number_barcode(orders, tmp_path):
+    merged_pdf_path = create_order_pdf(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER
+    )
+
+    reader = PdfReader(str(merged_pdf_path))
+    first_page = reader.pages[0].get_contents().get_data().decode("latin-1")
+    assert "/XObject" not in reader.pages[0]["/Resources"]
+
+    # Every bar is a filled rectangle
+    rects = [
+        [float(value) for value in line.split()[:4]]
+        for line in first_page.splitlines()
+        if line.endswith(" re f")
+    ]
+    bars, _ = code128_bars(orders[0].number)
+    assert len(rects) == len(bars)
+
+    # The bars start after the quiet zone, not right at the page margin
+    module_width = BARCODE_MODULE_WIDTH * 72
+    x = (HORIZONTAL_MARGIN + CODE128_QUIET_ZONE * BARCODE_MODULE_WIDTH) * 72
+    assert rects[0][0] == pytest.approx(x, abs=0.01)
+    assert rects[0][2] == pytest.approx(bars[0][1] * module_width, abs=0.01)
+
+
+def test_pull_sheet_leaves_shared_cards_untouched():
+    cards = [
+        make_card(name="Zombie", number="2", condition="Near Mint Foil"),
+        make_card(name="Angel", number="10"),
+    ]
+    orders = [make_order("1", cards=cards), make_order("2", cards=cards)]
+    magic_cards, pokemon_cards, other_cards = group_pull_cards(orders)
+    before = [card.model_dump() for card in magic_cards]
+
+    first = render_pull_sheet_bytes(magic_cards, pokemon_cards, other_cards)
+    second = render_pull_sheet_bytes(magic_cards, pokemon_cards, other_cards)
+
+    assert [card.model_dump() for card in magic_cards] == before
+    assert len(PdfReader(io.BytesIO(first)).pages) == len(
+        PdfReader(io.BytesIO(second)).pages
+    )
@@ -0,0 +1,89 @@
+"""Tests for packing slip PDF processing."""
+
+from fpdf import FPDF
+
+from slipdeck.checkpoint import Checkpoint
+from slipdeck.models.order import Marketplace
+from slipdeck.pdf_processor import (
+    index_packing_slips,
+    parse_packing_slips,
+    select_pages,
+)
+
+
+def write_header_only_pdf(path, headers):
+    pdf = FPDF(unit="pt", format="letter")
+    pdf.set_font("helvetica", size=10)
+    for header in headers:
+        pdf.add_page()
+        pdf.set_xy(300, 150)
+        pdf.cell(text=header)
+    pdf.output(str(path))
+    return str(path)
+
+
+def test_index_packing_slips_reads_headers(tmp_path):
+    pdf_path = write_header_only_pdf(
+        tmp_path / "slips.pdf",
+        [
+            "OrderNumber:AAAA-1111 Page1of2",
+            "OrderNumber:AAAA-1111 Page2of2",
+            "OrderNumber:BBBB-2222 Page1of1",
+        ],
+    )
+
+    index = index_packing_slips(pdf_path)
+
+    assert [(entry.order_number, entry.page_info.page) for entry in index] == [
+        ("AAAA-1111", 1),
+        ("AAAA-1111", 2),
+        ("BBBB-2222", 1),
+    ]
+    assert select_pages(index, ["BBBB-2222"]) == {3}
+    assert select_pages(index) == {1, 2, 3}
+
+
+def test_select_pages_by_shipping_method(tmp_path):
+    pdf_path = write_header_only_pdf(
+        tmp_path / "slips.pdf",
+        ["OrderNumber:AAAA-1111 Page1of1", "OrderNumber:BBBB-2222 Page1of1"],
+    )
+    index = index_packing_slips(pdf_path)
+    index[1].shipping_method = "Expedited (1-3 days)"
+
+    assert select_pages(index, shipping_method="expedited") == {2}
+    assert select_pages(index, ["AAAA-1111"], shipping_method="Expedited") == set()
+
+
+def test_parse_packing_slips_skips_unselected_orders(tmp_path):
+    pdf_path = write_header_only_pdf(
+        tmp_path / "slips.pdf",
+        ["OrderNumber:AAAA-1111 Page1of1", "OrderNumber:BBBB-2222 Page1of1"],
+    )
+
+    checkpoint = Checkpoint()
+    orders = parse_packing_slips(
+        pdf_path,
+        Marketplace.TCGPLAYER,
+        checkpoint=checkpoint,
+        selected_orders=["BBBB-2222"],
+    )
+
+    # The header-only pages have no sale information, so the selected order is
+    # quarantined while the other one is never parsed at all
+    assert orders == []
+    assert [failure.order_number for failure in checkpoint.state.failures] == [
+        "BBBB-2222"
+    ]
+
+
+def test_quarantine_without_reporter_stays_quiet(tmp_path, capsys):
+    pdf_path = write_header_only_pdf(
+        tmp_path / "slips.pdf", ["OrderNumber:AAAA-1111 Page1of1"]
+    )
+
+    checkpoint = Checkpoint()
+    parse_packing_slips(pdf_path, Marketplace.TCGPLAYER, checkpoint=checkpoint)
+
+    assert checkpoint.state.quarantined_orders == ["AAAA-1111"]
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,133 @@
+"""Tests for the progress event reporters."""
+
+import io
+import json
+
+from typer.testing import CliRunner
+
+from slipdeck.cli import app
+from slipdeck.models.order import Marketplace
+from slipdeck.pdf_creator import create_order_pdf
+from slipdeck.progress import JsonlProgressReporter
+from tests.conftest import make_order
+from tests.test_csv_ingest import write_exports
+
+
+def read_events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_jsonl_progress_reports_throughput_and_eta():
+    stream = io.StringIO()
+    progress = JsonlProgressReporter(stream, min_interval=0)
+    progress.start_stage("parse", "Parsing", "pages", total=4, completed=1)
+    progress.advance("parse", orders=1)
+    progress.end_stage("parse", "Processed 1 orders", orders=1)
+
+    start, update, end = read_events(stream)
+    assert start["event"] == "stage_start"
+    assert (start["stage"], start["total"], start["completed"]) == ("parse", 4, 1)
+    assert update["event"] == "progress"
+    assert update["completed"] == 2
+    assert update["orders"] == 1
+    assert update["pages_per_second"] > 0
+    assert update["eta_seconds"] >= 0
+    assert end["event"] == "stage_end"
+    assert end["description"] == "Processed 1 orders"
+
+
+def test_render_queue_depth_is_only_reported_for_chunks(tmp_path):
+    orders = [make_order(f"1234ABCD-5678EF-{i:05}") for i in range(3)]
+
+    def render_queue_depths(**kwargs):
+        stream = io.StringIO()
+        create_order_pdf(
+            orders,
+            tmp_path,
+            "Test Shop",
+            Marketplace.TCGPLAYER,
+            JsonlProgressReporter(stream, min_interval=0),
+            **kwargs,
+        )
+        return [
+            event.get("queue_depth")
+            for event in read_events(stream)
+            if event["event"] == "progress"
+        ]
+
+    assert render_queue_depths() == [None, None, None]
+    assert render_queue_depths(chunk_size=2) == [1, 0, 0]
+
+
+def test_jsonl_progress_is_rate_limited():
+    stream = io.StringIO()
+    progress = JsonlProgressReporter(stream, min_interval=60)
+    progress.start_stage("render", "Creating PDFs", "orders", total=1000)
+    for i in range(1000):
+        progress.advance("render", queue_depth=i + 1)
+    progress.end_stage("render", "Done")
+
+    events = read_events(stream)
+    assert [event["event"] for event in events] == ["stage_start", "stage_end"]
+    assert events[-1]["completed"] == 1000
+    assert events[-1]["queue_depth"] == 1000
+
+
+def test_jsonl_progress_log_strips_markup():
+    stream = io.StringIO()
+    JsonlProgressReporter(stream).log("[yellow]Resuming from checkpoint")
+    assert read_events(stream)[0]["message"] == "Resuming from checkpoint"
+
+
+def test_pack_writes_only_json_lines(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    order_list, pull_sheet = write_exports(tmp_path)
+    result = CliRunner().invoke(
+        app,
+        [
+            "pack",
+            order_list,
+            "--pull-sheet-csv",
+            pull_sheet,
+            "-o",
+            str(tmp_path / "output"),
+            "--company-name",
+            "Test Shop",
+            "--no-render-cache",
+            "--progress-format",
+            "jsonl",
+        ],
+    )
+
+    assert result.exit_code == 0, result.stdout
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    stage_events = [
+        (event["event"], event["stage"]) for event in events if "stage" in event
+    ]
+    assert stage_events == [
+        ("stage_start", "parse"),
+        ("stage_end", "parse"),
+        ("stage_start", "pull_sheet"),
+        ("stage_start", "render"),
+        ("stage_end", "render"),
+        ("stage_end", "pull_sheet"),
+    ]
+
+
+def test_pack_option_errors_are_json_lines(tmp_path):
+    result = CliRunner().invoke(
+        app,
+        [
+            "pack",
+            str(tmp_path / "slips.pdf"),
+            "--printer",
+            "zebra.local",
+            "--progress-format",
+            "jsonl",
+        ],
+    )
+
+    assert result.exit_code == 1
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [event["event"] for event in events] == ["log"]
+    assert events[0]["message"].startswith("Error: --printer")
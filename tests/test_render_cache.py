@@ -0,0 +1,70 @@
+"""Tests for the packing slip render cache."""
+
+import os
+
+from slipdeck.models.order import Marketplace
+from slipdeck.pdf_creator import LAYOUT_VERSION, create_order_pdf
+from slipdeck.render_cache import RenderCache, render_cache_key
+
+
+def test_render_cache_key_changes_with_content(orders):
+    key = render_cache_key(orders[0], "Test Shop", Marketplace.TCGPLAYER, 1)
+    assert key == render_cache_key(orders[0], "Test Shop", Marketplace.TCGPLAYER, 1)
+    assert key != render_cache_key(orders[0], "Other Shop", Marketplace.TCGPLAYER, 1)
+    assert key != render_cache_key(orders[0], "Test Shop", Marketplace.TCGPLAYER, 2)
+    orders[0].info.cards[0].Quantity = "3"
+    assert key != render_cache_key(orders[0], "Test Shop", Marketplace.TCGPLAYER, 1)
+
+
+def test_render_cache_hits_when_only_source_pages_shift(orders, tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+
+    create_order_pdf(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER, render_cache=cache
+    )
+    # An order added earlier in the export moves every later order's pages
+    for order in orders:
+        order.info.page_info = [
+            page_info.model_copy(update={"pdf_page": page_info.pdf_page + 1})
+            for page_info in order.info.page_info
+        ]
+    create_order_pdf(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER, render_cache=cache
+    )
+
+    assert (cache.hits, cache.misses) == (len(orders), len(orders))
+
+
+def test_create_order_pdf_reuses_cached_renders(orders, tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+
+    create_order_pdf(
+        orders, output_dir, "Test Shop", Marketplace.TCGPLAYER, render_cache=cache
+    )
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    orders[1].info.cards[0].Quantity = "2"
+    create_order_pdf(
+        orders, output_dir, "Test Shop", Marketplace.TCGPLAYER, render_cache=cache
+    )
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert cache.lookup(
+        render_cache_key(orders[1], "Test Shop", Marketplace.TCGPLAYER, LAYOUT_VERSION)
+    )
+
+
+def test_render_cache_trim_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(tmp_path / "cache", max_bytes=2048)
+    source = tmp_path / "slip.pdf"
+    source.write_bytes(b"x" * 1024)
+    for age, key in enumerate(["newest", "middle", "oldest"]):
+        path = cache.store(key, source)
+        os.utime(path, (1000 - age, 1000 - age))
+
+    cache.trim()
+
+    assert cache.lookup("oldest") is None
+    assert cache.lookup("middle") is not None
+    assert cache.lookup("newest") is not None
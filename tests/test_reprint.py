@@ -0,0 +1,81 @@
+"""Tests for reprinting orders from a merged batch."""
+
+import json
+
+from PyPDF2 import PdfReader
+
+from slipdeck.models.order import Marketplace
+from slipdeck.pdf_creator import create_order_pdf
+from slipdeck.reprint import (
+    extract_orders,
+    find_indexes,
+    get_index_path,
+    load_reprint_index,
+)
+from tests.conftest import make_order
+
+
+def test_merged_batch_index_and_reprint(orders, tmp_path):
+    merged_pdf_path = create_order_pdf(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER
+    )
+    index_path = get_index_path(merged_pdf_path)
+    assert find_indexes(tmp_path) == [index_path]
+
+    index = load_reprint_index(index_path)
+    assert index["pdf"] == merged_pdf_path.name
+    total_pages = len(PdfReader(str(merged_pdf_path)).pages)
+    first_start, first_end = index["orders"][orders[0].number]
+    second_start, second_end = index["orders"][orders[1].number]
+    assert first_start == 1
+    assert second_start == first_end + 1
+    assert second_end == total_pages
+
+    reprint_path, missing = extract_orders(
+        [merged_pdf_path], [orders[1].number, "UNKNOWN"], tmp_path
+    )
+    assert missing == ["UNKNOWN"]
+    assert len(PdfReader(str(reprint_path)).pages) == second_end - second_start + 1
+
+
+def test_reprint_without_matching_orders(orders, tmp_path):
+    merged_pdf_path = create_order_pdf(
+        orders[:1], tmp_path, "Test Shop", Marketplace.TCGPLAYER
+    )
+    reprint_path, missing = extract_orders(
+        [get_index_path(merged_pdf_path)], ["UNKNOWN"], tmp_path
+    )
+    assert reprint_path is None
+    assert missing == ["UNKNOWN"]
+
+
+def test_chunked_batch_parts_manifest_and_reprint(orders, tmp_path):
+    orders = orders + [make_order("5555ABCD-5678EF-05555")]
+    part_paths = create_order_pdf(
+        orders,
+        tmp_path,
+        "Test Shop",
+        Marketplace.TCGPLAYER,
+        chunk_size=2,
+        write_manifest=True,
+    )
+
+    assert [path.name.rsplit("_", 1)[1] for path in part_paths] == [
+        "part001.pdf",
+        "part002.pdf",
+    ]
+    manifest = json.loads(next(tmp_path.glob("*_manifest.json")).read_text())
+    assert manifest["complete"]
+    assert [part["orders"] for part in manifest["parts"]] == [
+        sorted(order.number for order in orders)[:2],
+        sorted(order.number for order in orders)[2:],
+    ]
+    assert not list(tmp_path.glob("*.tmp"))
+
+    reprint_path, missing = extract_orders(
+        find_indexes(tmp_path), [order.number for order in orders], tmp_path
+    )
+    assert missing == []
+    assert len(PdfReader(str(reprint_path)).pages) == sum(
+        len(PdfReader(str(path)).pages) for path in part_paths
+    )
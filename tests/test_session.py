@@ -0,0 +1,51 @@
+"""Tests for the in-memory Session API."""
+
+from io import BytesIO
+
+from PyPDF2 import PdfReader
+
+from slipdeck import Session
+from slipdeck.pdf_creator import render_order_pdf_bytes
+
+
+def test_session_renders_packing_slips_and_pull_sheet(orders):
+    with Session("Test Shop") as session:
+        packing_slips = session.render_packing_slips(orders)
+        pull_sheet = session.render_pull_sheet(orders)
+
+    assert packing_slips.startswith(b"%PDF")
+    assert pull_sheet.startswith(b"%PDF")
+    expected_pages = sum(
+        len(
+            PdfReader(
+                BytesIO(render_order_pdf_bytes(order, "Test Shop", session.marketplace))
+            ).pages
+        )
+        for order in orders
+    )
+    assert len(PdfReader(BytesIO(packing_slips)).pages) == expected_pages
+
+
+def test_session_worker_pool_is_reused(orders):
+    with Session("Test Shop", max_workers=2) as session:
+        first = session.render_packing_slips(orders)
+        executor = session.executor
+        second = session.render_packing_slips(orders)
+        assert session.executor is executor
+    assert session._executor is None
+    assert len(PdfReader(BytesIO(first)).pages) == len(PdfReader(BytesIO(second)).pages)
+
+
+def test_session_process_accepts_bytes():
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("helvetica", size=10)
+    pdf.cell(text="Not a packing slip")
+
+    result = Session("Test Shop").process(bytes(pdf.output()))
+
+    assert result.orders == []
+    assert result.failures == []
+    assert result.packing_slips.startswith(b"%PDF")
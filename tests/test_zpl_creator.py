@@ -0,0 +1,143 @@
+"""Tests for the ZPL packing slip backend."""
+
+import socket
+import socketserver
+import threading
+
+import pytest
+from typer.testing import CliRunner
+
+from slipdeck.cli import app
+
+from slipdeck.checkpoint import Checkpoint
+from slipdeck.models.order import Marketplace
+from slipdeck.zpl_creator import (
+    LOGO_GRAPHIC_NAME,
+    create_order_zpl,
+    escape_field_data,
+    parse_printer_address,
+    render_order_zpl,
+)
+
+
+def test_render_order_zpl_layout(orders):
+    labels = render_order_zpl(orders[0], "Test Shop", Marketplace.TCGPLAYER).decode()
+    assert labels.count("^XA") == labels.count("^XZ") == 1
+    assert "^PW812^LL1218" in labels
+    assert "Jane Doe" in labels
+    assert "Order: 1234ABCD-5678EF-01234" in labels
+    assert "Total Items: 1" in labels
+    assert "Total: $1.25" in labels
+
+
+def test_render_order_zpl_paginates_long_orders(orders):
+    labels = render_order_zpl(orders[1], "Test Shop", Marketplace.TCGPLAYER).decode()
+    pages = labels.count("^XA")
+    assert pages > 1
+    assert f"Page {pages} of {pages}" in labels
+
+
+def test_escape_field_data():
+    assert escape_field_data("a^b~c_d") == "a_5Eb_7Ec_5Fd"
+
+
+def test_parse_printer_address():
+    assert parse_printer_address("zebra.local") == ("zebra.local", 9100)
+    assert parse_printer_address("10.0.0.5:6101") == ("10.0.0.5", 6101)
+    assert parse_printer_address("[::1]:6101") == ("::1", 6101)
+    assert parse_printer_address("[::1]") == ("::1", 9100)
+    assert parse_printer_address("fe80::1") == ("fe80::1", 9100)
+    for address in ("zebra.local:", ":9100", "zebra.local:port", "[::1]x"):
+        with pytest.raises(ValueError):
+            parse_printer_address(address)
+
+
+def test_pack_reports_unreachable_printer(tmp_path):
+    # Grab a free port and close it again, so nothing is listening there
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "pack",
+            str(tmp_path / "slips.pdf"),
+            "--format",
+            "zpl",
+            "--printer",
+            f"127.0.0.1:{port}",
+        ],
+    )
+
+    assert result.exit_code == 1
+    assert "Could not connect to printer" in result.stdout
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+
+
+def test_create_order_zpl_streams_to_printer(orders, tmp_path):
+    received = []
+
+    class StubPrinter(socketserver.BaseRequestHandler):
+        def handle(self):
+            chunks = []
+            while data := self.request.recv(65536):
+                chunks.append(data)
+            received.append(b"".join(chunks))
+
+    with socketserver.TCPServer(("127.0.0.1", 0), StubPrinter) as server:
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+        host, port = server.server_address
+        zpl_path = create_order_zpl(
+            orders,
+            tmp_path,
+            "Test Shop",
+            Marketplace.TCGPLAYER,
+            printer=f"{host}:{port}",
+        )
+        thread.join(timeout=5)
+
+    assert received == [zpl_path.read_bytes()]
+    assert zpl_path.suffix == ".zpl"
+
+
+def test_create_order_zpl_downloads_logo_once(orders, tmp_path):
+    from PIL import Image
+
+    from slipdeck.pdf_creator import Logo
+
+    logo = Logo(Image.new("L", (300, 150)), width=1, height=0.5)
+    zpl = create_order_zpl(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER, logo=logo
+    ).read_text()
+
+    assert zpl.startswith(f"~DG{LOGO_GRAPHIC_NAME},{26 * 102},26,")
+    assert zpl.count("~DG") == 1
+    assert zpl.count(f"^XG{LOGO_GRAPHIC_NAME}") == len(orders)
+    assert zpl.rstrip().endswith(f"^XA^ID{LOGO_GRAPHIC_NAME}^FS^XZ")
+
+
+def test_create_order_zpl_quarantines_failed_orders(orders, tmp_path):
+    orders[0].info.cards[0].Price = "not a price"
+    checkpoint = Checkpoint()
+
+    zpl = create_order_zpl(
+        orders, tmp_path, "Test Shop", Marketplace.TCGPLAYER, checkpoint=checkpoint
+    ).read_text()
+
+    assert checkpoint.state.quarantined_orders == [orders[0].number]
+    assert checkpoint.state.failures[0].stage == "render"
+    assert f"Order: {orders[0].number}" not in zpl
+    assert f"Order: {orders[1].number}" in zpl
+
+
+def test_render_order_zpl_barcodes(orders):
+    labels = render_order_zpl(orders[0], "Test Shop", Marketplace.TCGPLAYER).decode()
+    assert f"^BCN,71,N,N,N,A^FH_^FD{orders[0].number}^FS" in labels
+    assert "^BQ" not in labels
+
+    labels = render_order_zpl(
+        orders[0], "Test Shop", Marketplace.TCGPLAYER, qr_code=True
+    ).decode()
+    assert f"^FDMA,{orders[0].number}^FS" in labels